@@ -0,0 +1,48 @@
+"""
+Замер сортировки русских названий с collation против сравнения через локаль.
+
+Сравниваются: встроенный sorted с functools.cmp_to_key(locale.strcoll),
+который вызывает функцию локали на каждом сравнении, sorted с ключом
+russian_collation и sort(..., collation="ru") с кешем ключей и рангами.
+
+Запуск: python bench_collation.py [--size N] [--distinct D] [--repeat R]
+"""
+import argparse
+import locale
+import random
+import timeit
+from functools import cmp_to_key
+
+from gnome_sort import russian_collation, sort
+
+SYLLABLES = ["ма", "ка", "ё", "жи", "са", "хар", "яй", "ца", "му", "ель", "ёж", "ры", "ба", "со", "ль", "Ё", "Е"]
+
+
+def make_names(rng, size, distinct):
+    pool = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).capitalize() for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, nargs="+", default=[2000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = {
+        "sorted + strcoll": lambda names: sorted(names, key=cmp_to_key(locale.strcoll)),
+        "sorted + ru-ключ": lambda names: sorted(names, key=russian_collation),
+        "sort(collation)": lambda names: sort(names, collation="ru"),
+    }
+    rng = random.Random(1)
+    print(f"{'различных':>10} {'способ':<18} {'время, мс':>10}")
+    for distinct in args.distinct:
+        names = make_names(rng, args.size, distinct)
+        for label, func in cases.items():
+            elapsed = min(timeit.repeat(lambda: func(list(names)), number=1, repeat=args.repeat))
+            print(f"{distinct:>10} {label:<18} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
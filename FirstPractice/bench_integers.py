@@ -0,0 +1,53 @@
+"""
+Замер сортировки целых без сравнений против адаптивной сортировки.
+
+Для каждого размера и размаха значений (включая отрицательные) печатается
+время адаптивной сортировки сравнениями, подсчёта, поразрядной сортировки
+и sort() по умолчанию, который выбирает путь сам.
+
+Запуск: python bench_integers.py [--sizes N ...] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+
+import gnome_sort
+from gnome_sort import sort
+
+SPANS = {
+    "n / 10": lambda n: max(1, n // 10),
+    "n": lambda n: n,
+    "16 * n": lambda n: 16 * n,
+    "2**32": lambda n: 2 ** 32,
+    "2**64": lambda n: 2 ** 64,
+}
+
+
+def measure(func, data, repeat):
+    return min(timeit.repeat(lambda: func(list(data)), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = {
+        "adaptive": gnome_sort._adaptive_sort,  # --движок напрямую: без передачи подсчёту--
+        "counting": gnome_sort._counting_sort,
+        "radix": gnome_sort._radix_sort,
+        "sort()": sort,
+    }
+    print(f"{'размер':>8} {'размах':<8} " + " ".join(f"{name + ', мс':>13}" for name in cases))
+    rng = random.Random(1)
+    for size in args.sizes:
+        for label, span in SPANS.items():
+            half = span(size) // 2
+            data = [rng.randint(-half, half) for _ in range(size)]
+            times = " ".join(f"{measure(func, data, args.repeat) * 1000:>13.2f}" for func in cases.values())
+            print(f"{size:>8} {label:<8} {times}")
+
+
+if __name__ == "__main__":
+    main()
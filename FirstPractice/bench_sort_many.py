@@ -0,0 +1,42 @@
+"""
+Замер sort_many против цикла из вызовов sort на множестве коротких списков.
+
+Запуск: python bench_sort_many.py [--lists M] [--length L] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+
+from gnome_sort import sort, sort_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lists", type=int, default=10_000)
+    parser.add_argument("--length", type=int, default=8, help="средняя длина списка")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    shapes = {
+        "int": lambda: rng.randint(1, 1000),
+        "float": lambda: rng.uniform(0, 1000),
+    }
+    print(f"{'вход':<6} {'способ':<22} {'время, мс':>10} {'ускорение':>10}")
+    for shape, make in shapes.items():
+        data = [[make() for _ in range(rng.randint(0, 2 * args.length))] for _ in range(args.lists)]
+        cases = {
+            "цикл sort": lambda lists: [sort(values) for values in lists],
+            "sort_many": sort_many,
+            "sort_many(flat=True)": lambda lists: sort_many(lists, flat=True),
+        }
+        baseline = None
+        for label, func in cases.items():
+            elapsed = min(timeit.repeat(lambda: func([list(values) for values in data]), number=1,
+                                        repeat=args.repeat))
+            baseline = baseline or elapsed
+            print(f"{shape:<6} {label:<22} {elapsed * 1000:>10.2f} {baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Сравнение SortedSequence с пересортировкой списка после каждой вставки.
+
+Запуск: python bench_sorted_sequence.py [--size N] [--inserts K]
+"""
+import argparse
+import random
+import time
+from bisect import insort
+
+from gnome_sort import sort
+from sorted_sequence import SortedSequence
+
+
+def resort_each_time(data, values):
+    for value in values:
+        data.append(value)
+        sort(data)
+
+
+def insort_each_time(data, values):
+    for value in values:
+        insort(data, value)
+
+
+def add_each_time(data, values):
+    for value in values:
+        data.add(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--inserts", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'размер':>9} {'способ':<22} {'мкс на вставку':>15}")
+    for size in args.size:
+        base = sorted(rng.uniform(0, 1000) for _ in range(size))
+        values = [rng.uniform(0, 1000) for _ in range(args.inserts)]
+        for name, func, data in (("sort после вставки", resort_each_time, list(base)),
+                                 ("bisect.insort", insort_each_time, list(base)),
+                                 ("SortedSequence.add", add_each_time, SortedSequence(base))):
+            start = time.perf_counter()
+            func(data, values)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>9} {name:<22} {elapsed / args.inserts * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
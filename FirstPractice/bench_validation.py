@@ -0,0 +1,55 @@
+"""
+Замер стоимости проверки элементов в sort для разных режимов validate.
+
+Запуск: python bench_validation.py [--size N] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+from array import array
+
+from gnome_sort import sort
+
+
+def legacy_strict(data):
+    # --прежняя проверка: генератор с isinstance на каждый элемент--
+    if not all(isinstance(x, (int, float)) for x in data):
+        raise ValueError("Все элементы списка должны быть числами")
+    return sort(data, validate="off")
+
+
+def measure(func, data, repeat):
+    return min(timeit.repeat(lambda: func(data[:]), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    shapes = {
+        "random": [rng.uniform(0, 1000) for _ in range(args.size)],
+        "sorted": [float(i) for i in range(args.size)],
+    }
+    print(f"{'вход':<8} {'режим':<14} {'время, мс':>10} {'ускорение':>10}")
+    for shape, data in shapes.items():
+        cases = {
+            "legacy strict": legacy_strict,
+            "strict": lambda values: sort(values, validate="strict"),
+            "off": lambda values: sort(values, validate="off"),
+        }
+        baseline = None
+        for mode, func in cases.items():
+            elapsed = measure(func, data, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{shape:<8} {mode:<14} {elapsed * 1000:>10.2f} {baseline / elapsed:>9.2f}x")
+        typed = array("d", data)
+        elapsed = min(timeit.repeat(lambda: sort(array("d", typed)), number=1, repeat=args.repeat))
+        label = "array('d')"
+        print(f"{shape:<8} {label:<14} {elapsed * 1000:>10.2f} {baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
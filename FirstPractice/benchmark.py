@@ -0,0 +1,224 @@
+"""
+Воспроизводимый замер сортировки на разных распределениях входных данных.
+
+Для каждой комбинации алгоритма, распределения и размера измеряется
+лучшее время из нескольких повторов, а отдельным прогоном с SortStats —
+число сравнений, обменов, сдвигов и шагов назад. Результат печатается таблицей и может быть
+сохранён в JSON, а затем использован как эталон для поиска регрессий.
+
+Примеры:
+    python benchmark.py --sizes 10 1000 100000 --json current.json
+    python benchmark.py --baseline current.json --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import gnome_sort
+from gnome_sort import SortStats, sort
+
+DEFAULT_SIZES = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+QUADRATIC_ALGORITHMS = ("gnome",)
+QUADRATIC_LIMIT = 5000  # --гномья сортировка на больших случайных данных идёт часами--
+COUNT_LIMIT = 100_000  # --подсчёт операций через обёртки в разы медленнее самой сортировки--
+COUNTERS = ("comparisons", "swaps", "moves", "backsteps")
+MIN_SECONDS = 0.001  # --более короткие замеры слишком шумные, чтобы искать в них регрессии--
+
+
+def _random(rng, n):
+    return [rng.randint(-n, n) for _ in range(n)]
+
+
+def _sorted(rng, n):
+    return list(range(n))
+
+
+def _reversed(rng, n):
+    return list(range(n, 0, -1))
+
+
+def _nearly_sorted(rng, n):
+    data = list(range(n))
+    for _ in range(max(1, n // 100)):
+        i, j = rng.randrange(n), rng.randrange(n)
+        data[i], data[j] = data[j], data[i]
+    return data
+
+
+def _local_swaps(rng, n):
+    data = list(range(n))
+    for _ in range(max(1, n // 20)):
+        i = rng.randrange(max(1, n - 1))
+        data[i:i + 2] = data[i:i + 2][::-1]
+    return data
+
+
+def _few_unique(rng, n):
+    values = [rng.randint(0, 1000) for _ in range(5)]
+    return [rng.choice(values) for _ in range(n)]
+
+
+def _organ_pipe(rng, n):
+    half = n // 2
+    return list(range(half)) + list(range(n - half, 0, -1))
+
+
+def _large_floats(rng, n):
+    return [rng.uniform(-1.0, 1.0) * 10.0 ** rng.randint(0, 300) for _ in range(n)]
+
+
+DISTRIBUTIONS = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "nearly_sorted": _nearly_sorted,
+    "local_swaps": _local_swaps,
+    "few_unique": _few_unique,
+    "organ_pipe": _organ_pipe,
+    "large_floats": _large_floats,
+}
+
+
+def make_input(distribution, size, seed):
+    """Одинаковые distribution, size и seed всегда дают одинаковый список."""
+    return DISTRIBUTIONS[distribution](random.Random(f"{seed}:{distribution}:{size}"), size)
+
+
+def count_operations(data, algorithm):
+    """Счётчики SortStats для одной сортировки копии data."""
+    stats = SortStats()
+    sort(list(data), algorithm=algorithm, stats=stats)
+    return stats
+
+
+def measure(data, algorithm, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        copy = list(data)
+        start = time.perf_counter()
+        sort(copy, algorithm=algorithm)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, distributions, algorithms, repeat=3, seed=1,
+        quadratic_limit=QUADRATIC_LIMIT, count_limit=COUNT_LIMIT, log=None):
+    results = []
+    for algorithm in algorithms:
+        for distribution in distributions:
+            for size in sizes:
+                if algorithm in QUADRATIC_ALGORITHMS and size > quadratic_limit:
+                    continue
+                data = make_input(distribution, size, seed)
+                if algorithm in gnome_sort.INTEGER_ALGORITHMS and not all(type(x) is int for x in data):
+                    continue  # --подсчёт и поразрядная сортировка не применимы к float--
+                row = {
+                    "algorithm": algorithm,
+                    "distribution": distribution,
+                    "size": size,
+                    "seconds": measure(data, algorithm, repeat),
+                    "comparisons": None,
+                    "swaps": None,
+                    "moves": None,
+                    "backsteps": None,
+                }
+                if size <= count_limit:
+                    stats = count_operations(data, algorithm)
+                    for field in COUNTERS:
+                        row[field] = getattr(stats, field)
+                results.append(row)
+                if log is not None:
+                    log(format_row(row))
+    return results
+
+
+def compare(results, baseline, threshold, min_seconds=MIN_SECONDS):
+    """Список строк с описанием регрессий: время или число сравнений выросло больше threshold."""
+    reference = {_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = reference.get(_key(row))
+        if old is None:
+            continue
+        for field in ("seconds", "comparisons"):
+            if row[field] is None or not old[field]:
+                continue
+            if field == "seconds" and max(row[field], old[field]) < min_seconds:
+                continue
+            change = row[field] / old[field] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{row['algorithm']}/{row['distribution']}/{row['size']}: "
+                    f"{field} {old[field]:.6g} -> {row[field]:.6g} (+{change:.0%})"
+                )
+    return regressions
+
+
+def _key(row):
+    return row["algorithm"], row["distribution"], row["size"]
+
+
+HEADER = (
+    f"{'алгоритм':<10} {'распределение':<14} {'размер':>9} {'время, мс':>11} "
+    f"{'сравнения':>12} {'обмены':>12} {'сдвиги':>12} {'шаги назад':>12}"
+)
+
+
+def format_row(row):
+    counters = " ".join(f"{'-' if row[field] is None else row[field]:>12}" for field in COUNTERS)
+    return (
+        f"{row['algorithm']:<10} {row['distribution']:<14} {row['size']:>9} "
+        f"{row['seconds'] * 1000:>11.3f} {counters}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--algorithms", nargs="+", choices=gnome_sort.ALGORITHMS, default=["adaptive", "gnome"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--quadratic-limit", type=int, default=QUADRATIC_LIMIT)
+    parser.add_argument("--count-limit", type=int, default=COUNT_LIMIT)
+    parser.add_argument("--json", help="куда сохранить результаты")
+    parser.add_argument("--baseline", help="JSON с эталонными результатами")
+    parser.add_argument("--threshold", type=float, default=0.10, help="допустимый рост, доля (0.10 = 10%%)")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS,
+                        help="замеры времени короче этого не сравниваются с эталоном")
+    args = parser.parse_args(argv)
+
+    print(HEADER)
+    results = run(args.sizes, args.distributions, args.algorithms, args.repeat, args.seed,
+                  args.quadratic_limit, args.count_limit, log=print)
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": gnome_sort.numpy is not None,
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as source:
+            baseline = json.load(source)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Внешняя сортировка числовых данных, которые не помещаются в память.
+
+Вход режется на серии, каждая из которых укладывается в лимит памяти
+вместе с рабочей памятью сортировки, серии сортируются и сбрасываются
+во временные файлы, а затем сливаются k-путевым слиянием на куче
+(heapq.merge).
+"""
+import heapq
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array as typed_array
+
+import gnome_sort
+from gnome_sort import ALGORITHMS, BUFFER_FORMATS, NUMPY_THRESHOLD, sort
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024  # --байт на серию и буферы слияния--
+MAX_FAN_IN = 64  # --сколько серий сливается за один проход; больше — промежуточные слияния--
+LIST_SLOT = 8 + 4  # --указатель в списке и половина указателя во временном буфере слияния--
+READER_OVERHEAD = 2048  # --генератор, небуферизованный файл и элемент кучи на каждую сливаемую серию--
+RESERVED = 16 * 1024  # --служебное вне серий и блоков: список путей к сериям, генераторы, mmap--
+
+
+def sort_stream(iterable, dtype="d", memory_limit=DEFAULT_MEMORY_LIMIT, tmpdir=None):
+    """
+    Генератор, выдающий числа из iterable по возрастанию.
+
+    dtype — код типа array.array, в котором хранятся серии на диске,
+    memory_limit — ограничение памяти в байтах, tmpdir — каталог для
+    временных файлов. Временные файлы удаляются, когда генератор
+    исчерпан или закрыт.
+    """
+    itemsize = _check_arguments(dtype, memory_limit)
+    memory_limit = _budget(memory_limit)
+    run_length = _run_length(dtype, itemsize, memory_limit)
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        chunks = _stream_chunks(iterable, dtype, run_length)
+        first = next(chunks, None)
+        if first is None:
+            return
+        if len(first) < run_length:  # --всё поместилось в одну неполную серию: диск не нужен--
+            _sort_run(first)
+            yield from first
+            return
+        runs = _spill_runs((first,), directory)
+        first = None  # --следующая серия читается, когда этой уже нет в памяти--
+        runs = _spill_runs(chunks, directory, runs)
+        merged, _ = _merge_runs(runs, dtype, itemsize, memory_limit, directory)
+        yield from merged
+
+
+def sort_file(src, dst, dtype="d", memory_limit=DEFAULT_MEMORY_LIMIT, tmpdir=None):
+    """
+    Сортирует двоичный файл src с числами типа dtype и записывает результат в dst.
+
+    Вход читается через mmap порциями не больше лимита памяти, формат
+    файла — значения array.array в машинном порядке байт без заголовка.
+    Возвращает количество отсортированных чисел.
+    """
+    itemsize = _check_arguments(dtype, memory_limit)
+    memory_limit = _budget(memory_limit)
+    run_length = _run_length(dtype, itemsize, memory_limit)
+    with open(src, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        if size % itemsize:
+            raise ValueError(f"Размер файла не кратен размеру элемента типа {dtype!r}")
+        if size == 0:
+            open(dst, "wb").close()
+            return 0
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+            chunks = _mapped_chunks(mapped, dtype, itemsize, run_length)
+            runs = _spill_runs(chunks, directory)
+            if len(runs) == 1:
+                shutil.move(runs[0], dst)  # --временный каталог может быть на другой файловой системе--
+            else:
+                merged, block_length = _merge_runs(runs, dtype, itemsize, memory_limit, directory)
+                _write_values(dst, merged, dtype, block_length)
+    return size // itemsize
+
+
+def _check_arguments(dtype, memory_limit):
+    if dtype not in BUFFER_FORMATS:
+        raise ValueError(f"Неизвестный числовой тип: {dtype!r}")
+    itemsize = typed_array(dtype).itemsize
+    if not isinstance(memory_limit, int) or memory_limit < itemsize:
+        raise ValueError("Лимит памяти должен быть не меньше размера одного элемента")
+    return itemsize
+
+
+def _budget(memory_limit):
+    # --память под серии и блоки слияния; при маленьком лимите служебному достаётся половина--
+    return memory_limit - min(RESERVED, memory_limit // 2)
+
+
+def _run_length(dtype, itemsize, memory_limit):
+    # --с NumPy к серии добавляется рабочий буфер устойчивой сортировки, не больше самой серии--
+    if gnome_sort.numpy is not None and memory_limit // (2 * itemsize) >= NUMPY_THRESHOLD:
+        return memory_limit // (2 * itemsize)
+    return max(1, memory_limit // (itemsize + _py_item_size(dtype, itemsize)))
+
+
+def _py_item_size(dtype, itemsize):
+    # --без NumPy серия сортируется списком: объект самого большого значения типа и место в списке--
+    largest = 0.0 if dtype in "fd" else 1 << (8 * itemsize)
+    return sys.getsizeof(largest) + LIST_SLOT
+
+
+def _block_length(itemsize, memory_limit, readers):
+    # --память слияния делится между читателями серий и буфером записи--
+    available = memory_limit - readers * READER_OVERHEAD
+    return max(1, available // ((readers + 1) * itemsize))
+
+
+def _fan_in(itemsize, memory_limit):
+    # --при маленьком лимите одновременно открытых серий меньше, чем MAX_FAN_IN--
+    return max(2, min(MAX_FAN_IN, memory_limit // (READER_OVERHEAD + 2 * itemsize) - 2))
+
+
+def _sort_run(chunk):
+    # --с NumPy серия сортируется на месте в своём буфере. Без него — списком и только
+    # сравнениями: сортировки целых без сравнений быстрее, но держат несколько копий серии--
+    if gnome_sort.numpy is not None and len(chunk) >= NUMPY_THRESHOLD:
+        sort(chunk)
+        return
+    values = chunk.tolist()
+    del chunk[:]  # --пока сортируется список, буфер серии не нужен--
+    ALGORITHMS["adaptive"](values)
+    chunk.fromlist(values)
+
+
+def _stream_chunks(iterable, dtype, run_length):
+    # --буфер серии выделяется сразу целиком: append растил бы его с запасом--
+    chunk, length = None, 0
+    for value in iterable:
+        if chunk is None:
+            chunk = typed_array(dtype, [0]) * run_length
+        if not isinstance(value, (int, float)):
+            raise ValueError("Все элементы списка должны быть числами")
+        try:
+            chunk[length] = value
+        except (TypeError, OverflowError):
+            raise ValueError(f"Значение {value!r} не помещается в тип {dtype!r}") from None
+        length += 1
+        if length == run_length:
+            yield chunk
+            chunk, length = None, 0
+    if length:
+        del chunk[length:]
+        yield chunk
+
+
+def _mapped_chunks(mapped, dtype, itemsize, run_length):
+    step = run_length * itemsize
+    for start in range(0, len(mapped), step):
+        chunk = typed_array(dtype)
+        chunk.frombytes(memoryview(mapped)[start:start + step])  # --срез memoryview не копирует байты--
+        yield chunk
+
+
+def _spill_runs(chunks, directory, runs=None):
+    runs = [] if runs is None else runs
+    for chunk in chunks:
+        _sort_run(chunk)
+        path = os.path.join(directory, f"run-{len(runs)}.bin")
+        with open(path, "wb", buffering=0) as run_file:
+            run_file.write(chunk)  # --прямо из буфера массива, tofile копировал бы его в bytes--
+        runs.append(path)
+        del chunk  # --иначе серия жила бы, пока читается следующая--
+    return runs
+
+
+def _read_run(path, dtype, block_length):
+    # --блок выделяется один раз и перечитывается на месте; без буфера io и без
+    # промежуточных bytes память читателя — только его блок--
+    block = typed_array(dtype, [0]) * block_length
+    with open(path, "rb", buffering=0) as run_file:
+        while len(block) == block_length:
+            with memoryview(block) as view, view.cast("B") as raw:
+                size = run_file.readinto(raw)
+            del block[size // block.itemsize:]  # --последний блок неполный--
+            yield from block
+
+
+def _merge_runs(runs, dtype, itemsize, memory_limit, directory):
+    # --промежуточные проходы, пока серий больше, чем можно держать открытыми; возвращает
+    # итератор последнего слияния и длину блока, которую можно взять и для буфера записи--
+    generation = 0
+    fan_in = _fan_in(itemsize, memory_limit)
+    while len(runs) > fan_in:
+        merged = []
+        block_length = _block_length(itemsize, memory_limit, fan_in)
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            path = os.path.join(directory, f"merge-{generation}-{len(merged)}.bin")
+            readers = [_read_run(run, dtype, block_length) for run in group]
+            _write_values(path, heapq.merge(*readers), dtype, block_length)
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        runs = merged
+        generation += 1
+
+    block_length = _block_length(itemsize, memory_limit, len(runs))
+    return heapq.merge(*(_read_run(run, dtype, block_length) for run in runs)), block_length
+
+
+def _write_values(path, values, dtype, block_length):
+    block, length = typed_array(dtype, [0]) * block_length, 0
+    with open(path, "wb", buffering=0) as output:
+        for value in values:
+            block[length] = value
+            length += 1
+            if length == block_length:
+                output.write(block)
+                length = 0
+        with memoryview(block) as view:
+            output.write(view[:length])
@@ -1,16 +1,1168 @@
-def sort(array):
-    if not isinstance(array, list):  # --аргумент является списком--
+import heapq
+import locale
+import os
+import time
+from array import array as typed_array
+from bisect import bisect_left, insort_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from multiprocessing import shared_memory
+from operator import index as _as_int
+
+try:
+    import numpy
+except ImportError:  # --NumPy необязателен, без него работает чистый Python--
+    numpy = None
+
+MIN_MERGE = 32  # --серии короче этого досортировываются вставками--
+MIN_GALLOP = 7  # --после стольких "побед" одной серии подряд включается галоп--
+NUMPY_THRESHOLD = 1000  # --с этой длины векторная сортировка окупает конвертацию--
+VALIDATE_MODES = ("strict", "off")
+BUFFER_FORMATS = frozenset("bBhHiIlLqQfd")  # --числовые форматы struct, общие с array.array--
+PARALLEL_THRESHOLD = 200_000  # --меньшие списки быстрее отсортировать в одном процессе--
+SELECT_CUTOFF = 16  # --короткий остаток в select проще отсортировать--
+INTEGER_THRESHOLD = 128  # --на коротких списках сортировка сравнениями не медленнее подсчёта--
+COUNTING_RANGE_FACTOR = 2  # --подсчёт выбирается, пока размах значений не больше n * этого множителя--
+RADIX_MAX_PASSES = 4  # --больше проходов поразрядной сортировки уже не выигрывают у сравнений--
+GNOME_MIN_RUN = 4  # --средняя длина серий, при которой почти упорядоченный вход пробует гномья сортировка--
+GNOME_MAX_RUN = 32  # --более длинные серии быстрее сливает адаптивная сортировка--
+DESCENT_SAMPLE = 1024  # --столько соседних пар проверяется, чтобы оценить длину серий--
+INTEGER_ALGORITHMS = ("counting", "radix")  # --сортируют только целые; float дают ValueError--
+WRITE_BACK_BLOCK = 4096  # --столько элементов за раз возвращается из списка в числовой буфер--
+
+
+def sort(array, algorithm="adaptive", as_ndarray=False, validate="strict", parallel=False, workers=None,
+         stats=None, on_event=None, key=None, reverse=False, collation=None):
+    if algorithm not in ALGORITHMS:  # --проверка, что алгоритм известен--
+        raise ValueError(f"Неизвестный алгоритм сортировки: {algorithm!r}")
+
+    if collation is not None and not callable(collation) and collation not in COLLATIONS:  # --схема сравнения строк--
+        raise ValueError(f"Неизвестная схема сравнения строк: {collation!r}")
+
+    if validate not in VALIDATE_MODES:  # --проверка режима валидации--
+        raise ValueError(f"Неизвестный режим проверки: {validate!r}")
+
+    if workers is not None and (not isinstance(workers, int) or workers < 1):  # --число процессов--
+        raise ValueError("Число процессов должно быть положительным целым")
+
+    if (key is not None or collation is not None) and as_ndarray:
+        raise ValueError("as_ndarray нельзя сочетать с key и collation")
+
+    if collation is not None and not isinstance(array, list):  # --строки бывают только в списке--
         raise TypeError("Аргумент должен быть списком")
-    
-    if not all(isinstance(x, (int, float)) for x in array):  # --проверка, что все элементы списка числа--
+
+    if not isinstance(array, list):  # --аргумент является списком или числовым буфером--
+        try:
+            view = memoryview(array)
+        except TypeError:
+            raise TypeError("Аргумент должен быть списком") from None
+        return _sort_buffer(array, view, algorithm, as_ndarray, stats, on_event, key, reverse)
+
+    if key is not None or collation is not None:  # --ключи вычисляются один раз, порядок строится по ним--
+        keys = array if key is None else list(map(key, array))
+        if collation is not None:
+            order = _collation_order(keys, collation, algorithm, reverse, validate, stats, on_event)
+        else:
+            kinds = _check_numbers(keys) if validate != "off" else None
+            order = _argsort(keys, algorithm, reverse, kinds, stats, on_event)
+        array[:] = [array[i] for i in order]
+        return array
+
+    kinds = None
+    if validate == "strict":
+        kinds = _check_numbers(array)  # --проверка, что все элементы списка числа--
+
+    if as_ndarray:  # --вызывающему нужен ndarray: список не трогаем--
+        if numpy is None:
+            raise ImportError("Для as_ndarray=True требуется NumPy")
+        result = numpy.sort(numpy.array(array), kind="stable")
+        return result[::-1] if reverse else result
+
+    if reverse:  # --развернуть, отсортировать устойчиво и развернуть обратно: равные сохраняют порядок--
+        array.reverse()
+    _sort_values(array, algorithm, kinds, validate, parallel, workers, stats, on_event)
+    if reverse:
+        array.reverse()
+    return array
+
+
+def _sort_values(array, algorithm, kinds, validate, parallel, workers, stats, on_event):
+    if stats is not None or on_event is not None:  # --инструментированный прогон на чистом Python--
+        if kinds is None and validate != "off":
+            kinds = _check_numbers(array)
+        _instrumented_sort(array, algorithm, stats, on_event, kinds)
+        return
+
+    if parallel or workers is not None:
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(array) >= PARALLEL_THRESHOLD and _parallel_sort(array, kinds, algorithm, workers):
+            return
+
+    if algorithm == "adaptive" and len(array) >= NUMPY_THRESHOLD and _numpy_sort(array, kinds):
+        return
+
+    if algorithm == "adaptive" and (_presorted_sort(array) or _integer_sort(array, kinds)):
+        return
+
+    ALGORITHMS[algorithm](array)
+
+
+def _argsort(keys, algorithm, reverse, kinds=None, stats=None, on_event=None):
+    """
+    Устойчивая перестановка индексов, упорядочивающая keys.
+
+    Для обратного порядка ключи разворачиваются, сортируются по
+    возрастанию и перестановка разворачивается обратно, поэтому равные
+    ключи и здесь сохраняют исходный порядок.
+    """
+    n = len(keys)
+    if reverse:
+        keys = keys[::-1]
+    order = None
+    if (algorithm == "adaptive" and numpy is not None and stats is None and on_event is None
+            and n >= NUMPY_THRESHOLD and kinds in ({int}, {float})):
+        try:
+            order = numpy.argsort(numpy.array(keys, dtype=numpy.int64 if kinds == {int} else numpy.float64),
+                                  kind="stable").tolist()
+        except OverflowError:
+            order = None
+    if order is None and algorithm == "adaptive":  # --с подсчётом выбирается тот же алгоритм, что и без него--
+        algorithm = _integer_algorithm(keys, kinds) or algorithm
+    if order is None and algorithm in INTEGER_ALGORITHMS:
+        order = list(range(n))
+        if stats is not None or on_event is not None:
+            _instrumented_sort(order, algorithm, stats, on_event, keys=_integer_keys(keys))
+        else:
+            ALGORITHMS[algorithm](order, _integer_keys(keys))
+    if order is None:
+        decorated = list(zip(keys, range(n)))  # --индекс разрешает равенство ключей и не даёт сравнивать элементы--
+        if stats is not None or on_event is not None:
+            _instrumented_sort(decorated, algorithm, stats, on_event)
+        else:
+            ALGORITHMS[algorithm](decorated)
+        order = [index for _, index in decorated]
+    if reverse:
+        order = [n - 1 - index for index in reversed(order)]
+    return order
+
+
+def _check_numbers(values):
+    """
+    Проверяет, что все значения — числа, и возвращает множество их типов.
+
+    Типы собираются через set(map(type, ...)) на скорости C, а isinstance
+    вызывается только для редких подклассов int и float.
+    """
+    kinds = set(map(type, values))
+    if not kinds <= {int, float} and not all(issubclass(kind, (int, float)) for kind in kinds):
         raise ValueError("Все элементы списка должны быть числами")
+    return kinds
+
+
+def russian_collation(text):
+    """Ключ сравнения русских строк: без учёта регистра, «ё» сразу после «е», а не после «я»."""
+    return text.casefold().translate(_RUSSIAN_ORDER)
+
+
+# --буквы от «ж» до «я» сдвигаются на одну позицию вверх, «ё» занимает место «ж»--
+_RUSSIAN_ORDER = str.maketrans({"ё": "ж", **{chr(code): chr(code + 1) for code in range(ord("ж"), ord("я") + 1)}})
+
+COLLATIONS = {
+    "ru": russian_collation,
+    "locale": locale.strxfrm,  # --порядок текущей локали LC_COLLATE--
+}
+
+
+def _collation_order(texts, collation, algorithm, reverse, validate, stats=None, on_event=None):
+    """
+    Устойчивая перестановка, упорядочивающая строки по схеме collation.
+
+    Ключ сравнения вычисляется один раз на каждую различную строку,
+    различные строки упорядочиваются по ключам, а затем каждой строке
+    сопоставляется целый ранг, и все ранги сортируются подсчётом.
+    Функция сравнения локали не вызывается ни на одной паре элементов.
+    """
+    if validate != "off":
+        _check_strings(texts)
+    collate = COLLATIONS[collation] if isinstance(collation, str) else collation
+    distinct = list(dict.fromkeys(texts))
+    keys = list(map(collate, distinct))
+    ranks, rank, previous = {}, -1, None
+    for position in _argsort(keys, "adaptive", False):
+        if rank < 0 or keys[position] != previous:  # --строки с равными ключами получают один ранг--
+            rank += 1
+            previous = keys[position]
+        ranks[distinct[position]] = rank
+    return _argsort(list(map(ranks.__getitem__, texts)), algorithm, reverse, {int}, stats, on_event)
+
+
+def _check_strings(values):
+    kinds = set(map(type, values))
+    if not kinds <= {str} and not all(issubclass(kind, str) for kind in kinds):
+        raise ValueError("Все элементы списка должны быть строками")
+
+
+def _numpy_sort(array, kinds=None):
+    """
+    Сортирует однородный список int или float через ndarray.
+
+    Возвращает False, если NumPy недоступен, список смешанный (int вместе
+    с float) или целые не помещаются в int64 — тогда сортирует чистый Python.
+    """
+    if numpy is None:
+        return False
+    if kinds is None:
+        kinds = set(map(type, array))
+    if kinds == {int}:
+        dtype = numpy.int64
+    elif kinds == {float}:
+        dtype = numpy.float64
+    else:
+        return False
+    try:
+        values = numpy.array(array, dtype=dtype)
+    except OverflowError:
+        return False
+    values.sort(kind="stable")
+    array[:] = values.tolist()
+    return True
+
+
+def _parallel_sort(array, kinds, algorithm, workers):
+    """
+    Сортирует однородный числовой список по частям в нескольких процессах.
+
+    Значения копируются один раз в multiprocessing.shared_memory, и каждый
+    процесс сортирует свой участок на месте. Затем по регулярной выборке из
+    отсортированных участков выбираются разделители, и каждый процесс
+    собирает в выходной блок свой диапазон значений из всех участков.
+    Диапазоны не пересекаются, поэтому главный процесс ничего не сливает,
+    а только читает готовый блок. В процессы передаются только имена
+    блоков и границы. Возвращает False для смешанных списков и целых вне int64.
+    """
+    if kinds is None:
+        kinds = set(map(type, array))
+    if kinds == {int}:
+        dtype = "q"
+    elif kinds == {float}:
+        dtype = "d"
+    else:
+        return False
+    try:
+        values = typed_array(dtype, array)
+    except OverflowError:
+        return False
+
+    nbytes = len(values) * values.itemsize
+    source = shared_memory.SharedMemory(create=True, size=nbytes)
+    target = None
+    try:
+        target = shared_memory.SharedMemory(create=True, size=nbytes)
+        with source.buf[:nbytes] as raw, raw.cast(dtype) as view:
+            view[:] = values
+            del values
+            step = -(-len(view) // workers)
+            bounds = [(start, min(start + step, len(view))) for start in range(0, len(view), step)]
+            with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+                for job in [pool.submit(_sort_shared_chunk, source.name, dtype, start, stop, algorithm)
+                            for start, stop in bounds]:
+                    job.result()
+                cuts = _splitter_cuts(view, bounds)
+                jobs, offset = [], 0
+                for part in range(len(bounds)):
+                    pieces = [(chunk_cuts[part], chunk_cuts[part + 1]) for chunk_cuts in cuts]
+                    jobs.append(pool.submit(_gather_shared_range, source.name, target.name, dtype, pieces, offset))
+                    offset += sum(stop - start for start, stop in pieces)
+                for job in jobs:
+                    job.result()
+        with target.buf[:nbytes] as raw, raw.cast(dtype) as view:
+            array[:] = view.tolist()
+    finally:
+        for block in (source, target):
+            if block is not None:
+                block.close()
+                block.unlink()
+    return True
+
+
+def _splitter_cuts(view, bounds):
+    # --регулярная выборка: из каждого отсортированного участка по p значений через равные
+    # промежутки; p - 1 разделителей из неё делят данные на диапазоны не больше 2n / p.
+    # Для каждого участка возвращаются границы его кусков, попадающих в каждый диапазон--
+    parts = len(bounds)
+    sample = sorted(view[start + (stop - start) * k // parts] for start, stop in bounds for k in range(parts))
+    splitters = sample[parts::parts]
+    return [[start, *(bisect_left(view, splitter, start, stop) for splitter in splitters), stop]
+            for start, stop in bounds]
+
+
+def _sort_shared_chunk(name, dtype, start, stop, algorithm):
+    # --выполняется в дочернем процессе: сортирует свой участок общего блока на месте--
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        itemsize = typed_array(dtype).itemsize
+        with block.buf[start * itemsize:stop * itemsize] as raw, raw.cast(dtype) as chunk:
+            sort(chunk, algorithm=algorithm)
+    finally:
+        block.close()
+
+
+def _gather_shared_range(source_name, target_name, dtype, pieces, offset):
+    # --выполняется в дочернем процессе: куски одного диапазона из всех участков копируются
+    # подряд в выходной блок с позиции offset и досортировываются. Куски уже упорядочены,
+    # и адаптивная сортировка только сливает эти серии; равные остаются в порядке участков--
+    source = shared_memory.SharedMemory(name=source_name)
+    target = shared_memory.SharedMemory(name=target_name)
+    try:
+        itemsize = typed_array(dtype).itemsize
+        total = sum(stop - start for start, stop in pieces)
+        with target.buf[offset * itemsize:(offset + total) * itemsize] as raw, raw.cast(dtype) as output:
+            position = 0
+            for start, stop in pieces:
+                with source.buf[start * itemsize:stop * itemsize] as piece, piece.cast(dtype) as values:
+                    output[position:position + len(values)] = values
+                position += stop - start
+            sort(output)
+    finally:
+        source.close()
+        target.close()
+
+
+def _sort_buffer(buffer, view, algorithm, as_ndarray, stats=None, on_event=None, key=None, reverse=False):
+    """
+    Сортирует на месте одномерный числовой буфер: array.array, memoryview, bytearray.
+
+    Тип элементов известен из формата буфера, поэтому поэлементная проверка не нужна.
+    """
+    if view.ndim != 1:
+        raise TypeError("Буфер должен быть одномерным")
+    if view.format not in BUFFER_FORMATS:
+        raise ValueError("Все элементы списка должны быть числами")
+
+    if as_ndarray:
+        if numpy is None:
+            raise ImportError("Для as_ndarray=True требуется NumPy")
+        result = numpy.sort(numpy.array(view, dtype=view.format), kind="stable")
+        return result[::-1] if reverse else result
+
+    if view.readonly:
+        raise TypeError("Буфер доступен только для чтения")
+
+    instrumented = stats is not None or on_event is not None
+    if (algorithm == "adaptive" and numpy is not None and not instrumented and key is None and not reverse
+            and view.contiguous and len(view) >= NUMPY_THRESHOLD):
+        numpy.frombuffer(view, dtype=view.format).sort(kind="stable")  # --без копирования--
+        return buffer
+
+    values = view.tolist()
+    if instrumented or key is not None or reverse:
+        sort(values, algorithm, validate="off" if key is None and not instrumented else "strict", stats=stats, on_event=on_event, key=key, reverse=reverse)
+    elif not (algorithm == "adaptive" and _integer_sort(values, set(map(type, values[:1])))):
+        ALGORITHMS[algorithm](values)
+    for start in range(0, len(values), WRITE_BACK_BLOCK):  # --кусками: без второй копии всего буфера--
+        view[start:start + WRITE_BACK_BLOCK] = typed_array(view.format, values[start:start + WRITE_BACK_BLOCK])
+    return buffer
+
+
+def sort_many(lists, algorithm="adaptive", validate="strict", flat=False):
+    """
+    Сортирует много списков чисел за один вызов.
+
+    Все элементы проверяются одним проходом по склеенным спискам, а не
+    по вызову sort на каждый список. С NumPy однородные данные сортируются
+    одной сегментной сортировкой: numpy.lexsort по парам (номер списка,
+    значение). По умолчанию каждый список сортируется на месте и
+    возвращается lists; при flat=True исходные списки не меняются, а
+    возвращается пара (flat, offsets): общий отсортированный по кускам
+    список и границы кусков, i-й список — flat[offsets[i]:offsets[i + 1]].
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм сортировки: {algorithm!r}")
+    if validate not in VALIDATE_MODES:
+        raise ValueError(f"Неизвестный режим проверки: {validate!r}")
+    if not isinstance(lists, list) or not all(isinstance(segment, list) for segment in lists):
+        raise TypeError("Аргумент должен быть списком списков")
+
+    offsets = [0]
+    for segment in lists:
+        offsets.append(offsets[-1] + len(segment))
+    values = list(chain.from_iterable(lists))
+    kinds = _check_numbers(values) if validate != "off" else set(map(type, values))
+
+    if algorithm == "adaptive" and len(values) >= NUMPY_THRESHOLD and _numpy_segments(values, offsets, kinds):
+        if flat:
+            return values, offsets
+        for segment, start, stop in zip(lists, offsets, offsets[1:]):
+            segment[:] = values[start:stop]
+        return lists
+
+    segments = [list(segment) for segment in lists] if flat else lists
+    for segment in segments:  # --проверка уже пройдена: каждый список идёт прямо в движок--
+        if algorithm == "adaptive" and 1 < len(segment) < MIN_MERGE:
+            segment[:] = _insertion_sorted(segment)
+        elif len(segment) > 1:
+            _sort_values(segment, algorithm, kinds, "strict", False, None, None, None)
+    if flat:
+        return list(chain.from_iterable(segments)), offsets
+    return lists
+
+
+def _insertion_sorted(segment):
+    # --те же бинарные вставки, что у _adaptive_sort на коротком списке, но поиск и сдвиг делает bisect на C--
+    result = []
+    for value in segment:
+        insort_right(result, value)
+    return result
+
+
+def _numpy_segments(values, offsets, kinds):
+    # --сегментная сортировка: главный ключ — номер списка, второй — значение; обе устойчивы--
+    if numpy is None or kinds not in ({int}, {float}):
+        return False
+    try:
+        data = numpy.array(values, dtype=numpy.int64 if kinds == {int} else numpy.float64)
+    except OverflowError:
+        return False
+    segments = numpy.repeat(numpy.arange(len(offsets) - 1), numpy.diff(offsets))
+    values[:] = data[numpy.lexsort((data, segments))].tolist()
+    return True
+
+
+def argsort(values, algorithm="adaptive", reverse=False):
+    """
+    Устойчивая перестановка индексов, которая упорядочила бы values.
+
+    Сами данные не перемещаются: take(column, order) собирает по
+    перестановке любой параллельный столбец. Равные значения сохраняют
+    исходный порядок и при reverse=True.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм сортировки: {algorithm!r}")
+    values, kinds = _readable_values(values)
+    return _argsort(values, algorithm, reverse, kinds)
+
+
+def lexsort(*keys, algorithm="adaptive"):
+    """
+    Устойчивая перестановка для сортировки по нескольким столбцам-ключам.
+
+    Первый ключ главный, следующие разрешают равенство предыдущих — как
+    при сортировке кортежей, но без их построения (у numpy.lexsort,
+    наоборот, главный ключ последний). Ключи упорядочиваются по одному,
+    начиная с последнего, и устойчивость каждого прохода сохраняет
+    порядок, заданный предыдущими.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм сортировки: {algorithm!r}")
+    if not keys:
+        raise ValueError("Нужен хотя бы один ключ")
+    columns = [_readable_values(key) for key in keys]
+    n = len(columns[0][0])
+    if any(len(values) != n for values, _ in columns):
+        raise ValueError("Ключи должны быть одной длины")
+
+    if (algorithm == "adaptive" and numpy is not None and n >= NUMPY_THRESHOLD
+            and all(kinds in ({int}, {float}) for _, kinds in columns)):
+        try:
+            return numpy.lexsort([numpy.array(values, dtype=numpy.int64 if kinds == {int} else numpy.float64)
+                                  for values, kinds in reversed(columns)]).tolist()
+        except OverflowError:
+            pass
+
+    order = list(range(n))
+    for values, kinds in reversed(columns):
+        permuted = list(map(values.__getitem__, order))
+        order = list(map(order.__getitem__, _argsort(permuted, algorithm, False, kinds)))
+    return order
+
+
+def take(values, order):
+    """Значения values в порядке перестановки order; array.array остаётся array.array того же типа."""
+    gathered = map(values.__getitem__, order)
+    if isinstance(values, typed_array):
+        return typed_array(values.typecode, gathered)
+    return list(gathered)
+
+
+def runs(array):
+    """Число неубывающих серий: 1 для упорядоченного списка, n для строго убывающего, 0 для пустого."""
+    values, _ = _readable_values(array)
+    return sum(1 for i in range(1, len(values)) if values[i] < values[i - 1]) + (len(values) > 0)
+
+
+def inversions(array):
+    """
+    Число пар i < j, где array[i] > array[j], за O(n log n).
+
+    Столько обменов сделала бы гномья сортировка. Считается слиянием:
+    естественные серии сливаются попарно, и когда элемент правой серии
+    обгоняет остаток левой, к счёту прибавляется длина этого остатка.
+    Исходные данные не изменяются.
+    """
+    values, _ = _readable_values(array)
+    bounds = [0] + [i for i in range(1, len(values)) if values[i] < values[i - 1]] + [len(values)]
+    segments = [values[start:stop] for start, stop in zip(bounds, bounds[1:]) if stop > start]
+    total = 0
+    while len(segments) > 1:
+        merged = []
+        for left, right in zip(segments[::2], segments[1::2]):
+            result = []
+            i = j = 0
+            while i < len(left) and j < len(right):
+                if right[j] < left[i]:
+                    result.append(right[j])
+                    total += len(left) - i
+                    j += 1
+                else:
+                    result.append(left[i])
+                    i += 1
+            result.extend(left[i:])
+            result.extend(right[j:])
+            merged.append(result)
+        if len(segments) % 2:
+            merged.append(segments[-1])
+        segments = merged
+    return total
+
+
+def smallest(array, k, key=None):
+    """k наименьших элементов по возрастанию за O(n log k), без полной сортировки."""
+    return _top(array, k, key, heapq.nsmallest)
+
+
+def largest(array, k, key=None):
+    """k наибольших элементов по убыванию за O(n log k), без полной сортировки."""
+    return _top(array, k, key, heapq.nlargest)
+
+
+def select(array, index, key=None):
+    """
+    Элемент, который стоял бы на позиции index после сортировки, за O(n).
+
+    Используется интроселект: быстрый выбор с опорным элементом по
+    медиане трёх, а если разбиения выходят неудачными — медиана медиан.
+    Отрицательный index считается с конца, как у списка.
+    """
+    values, _ = _readable_values(array, key)
+    n = len(values)
+    if not isinstance(index, int) or not -n <= index < n:
+        raise IndexError("Индекс вне списка")
+    if index < 0:
+        index += n
+    if key is None:
+        return _introselect(values, index)
+    keys = list(map(key, values))
+    _check_numbers(keys)
+    _, position = _introselect(list(zip(keys, range(n))), index)
+    return values[position]
+
+
+def iter_sorted(array, key=None):
+    """
+    Ленивый итератор элементов по возрастанию.
+
+    Построение кучи стоит O(n), каждый следующий элемент — O(log n),
+    поэтому хвост, до которого вызывающий не дочитал, не сортируется.
+    """
+    values, kinds = _readable_values(array, key)  # --проверка сразу, а не при первом next()--
+    if key is None and len(kinds) <= 1:
+        heapq.heapify(values)  # --однородные числа: равные неотличимы, индексы не нужны--
+        return _drain(values, None)
+    # --пары (ключ, индекс): равные ключи, а также равные int и float выходят в исходном порядке--
+    keys = values if key is None else list(map(key, values))
+    if key is not None:
+        _check_numbers(keys)
+    heap = list(zip(keys, range(len(values))))
+    heapq.heapify(heap)
+    return _drain(heap, values)
+
 
+def _drain(heap, values):
+    while heap:
+        item = heapq.heappop(heap)
+        yield item if values is None else values[item[1]]
+
+
+def _top(array, k, key, pick):
+    if not isinstance(k, int) or k < 0:
+        raise ValueError("k должно быть неотрицательным целым")
+    values, _ = _readable_values(array, key)
+    if key is None:
+        return pick(k, values)
+    keys = list(map(key, values))
+    _check_numbers(keys)
+    return [values[i] for i in pick(k, range(len(values)), key=keys.__getitem__)]
+
+
+def _readable_values(array, key=None):
+    # --те же правила, что у sort: список чисел (или любых объектов при key) либо одномерный числовой буфер--
+    if isinstance(array, list):
+        return list(array), (_check_numbers(array) if key is None else None)
+    try:
+        view = memoryview(array)
+    except TypeError:
+        raise TypeError("Аргумент должен быть списком") from None
+    if view.ndim != 1:
+        raise TypeError("Буфер должен быть одномерным")
+    if view.format not in BUFFER_FORMATS:
+        raise ValueError("Все элементы списка должны быть числами")
+    values = view.tolist()
+    return values, set(map(type, values[:1]))
+
+
+def _introselect(values, index):
+    depth = 2 * len(values).bit_length()
+    while len(values) > SELECT_CUTOFF:
+        if depth > 0:
+            depth -= 1
+            first, middle, last = values[0], values[len(values) // 2], values[-1]
+            pivot = sorted((first, middle, last))[1]
+        else:  # --разбиения неудачны: медиана медиан гарантирует O(n)--
+            pivot = _median_of_medians(values)
+        less = [x for x in values if x < pivot]
+        if index < len(less):
+            values = less
+            continue
+        greater = [x for x in values if pivot < x]
+        equal = len(values) - len(less) - len(greater)
+        if index < len(less) + equal:
+            return next(x for x in values if not x < pivot and not pivot < x)
+        index -= len(less) + equal
+        values = greater
+    ALGORITHMS["adaptive"](values)
+    return values[index]
+
+
+def _median_of_medians(values):
+    medians = []
+    for start in range(0, len(values), 5):
+        group = values[start:start + 5]
+        ALGORITHMS["adaptive"](group)
+        medians.append(group[len(group) // 2])
+    return _introselect(medians, len(medians) // 2)
+
+
+class SortStats:
+    """
+    Счётчики одной или нескольких сортировок, переданных через sort(..., stats=...).
+
+    comparisons — сравнения элементов, swaps — обмены двух элементов местами,
+    moves — прочие перемещения (сдвиги при вставках и слияниях),
+    backsteps — перемещения элемента ближе к началу списка (у гномьей
+    сортировки это шаги индекса назад), passes — проходы алгоритма
+    (проход поиска серий и каждое слияние), elapsed — время в секундах
+    с учётом накладных расходов на подсчёт.
+    """
+
+    def __init__(self):
+        self.algorithm = None
+        self.comparisons = 0
+        self.swaps = 0
+        self.moves = 0
+        self.backsteps = 0
+        self.passes = 0
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"SortStats({fields})"
+
+
+class _Tracked:
+    """Элемент инструментированного списка: значение, последняя позиция и счётчик сравнений."""
+
+    __slots__ = ("value", "position", "owner")
+
+    def __init__(self, value, position, owner):
+        self.value = value
+        self.position = position
+        self.owner = owner
+
+    def __lt__(self, other):
+        self.owner.compared()
+        return self.value < other.value
+
+    def __le__(self, other):
+        self.owner.compared()
+        return self.value <= other.value
+
+    def __gt__(self, other):
+        self.owner.compared()
+        return self.value > other.value
+
+    def __ge__(self, other):
+        self.owner.compared()
+        return self.value >= other.value
+
+    def __index__(self):  # --ключ для сортировки подсчётом; сравнением не считается--
+        return _as_int(self.value)
+
+
+class _InstrumentedList(list):
+    """
+    Список обёрток _Tracked, который считает сравнения и записи.
+
+    Алгоритмы работают с ним так же, как с обычным списком, поэтому без
+    stats и on_event сортировка не платит за подсчёт ничего.
+    """
+
+    def __init__(self, values, stats, on_event):
+        super().__init__(_Tracked(value, position, self) for position, value in enumerate(values))
+        self.stats = stats
+        self.on_event = on_event
+
+    def _emit(self, event):
+        if self.on_event is not None:
+            self.on_event(event, self.stats)
+
+    def compared(self):
+        self.stats.comparisons += 1
+        self._emit("compare")
+
+    def note_pass(self):
+        self.stats.passes += 1
+        self._emit("pass")
+
+    def _moved(self, element, position, occupant=None):
+        if element.position == position:
+            return
+        if occupant is not None and occupant is not element and occupant.position == element.position:
+            # --вытесненный элемент уже занял прежнее место этого: это вторая половина обмена--
+            self.stats.moves -= 1
+            self.stats.swaps += 1
+            self._emit("swap")
+        else:
+            self.stats.moves += 1
+        if position < element.position:
+            self.stats.backsteps += 1
+            self._emit("backstep")
+        element.position = position
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            positions = range(*index.indices(len(self)))
+            if len(positions) == len(value):
+                for position, element in zip(positions, value):
+                    self._moved(element, position)
+        else:
+            if index < 0:
+                index += len(self)
+            self._moved(value, index, list.__getitem__(self, index))
+        super().__setitem__(index, value)
+
+
+def _instrumented_sort(array, algorithm, stats, on_event, kinds=None, keys=None):
+    # --keys: целые ключи, по которым подсчёт и поразрядная сортировка упорядочивают array (перестановку индексов)--
+    if stats is None:
+        stats = SortStats()
+    stats.algorithm = algorithm
+    tracked = _InstrumentedList(array, stats, on_event)
+    start = time.perf_counter()
+    chosen = None
+    if algorithm == "adaptive":  # --тот же выбор, что в _sort_values: гномья, затем подсчёт целых--
+        chosen = _presorted_sort(tracked, array)
+        if chosen is None:
+            chosen = _integer_algorithm(array, kinds)
+            if chosen is not None:
+                ALGORITHMS[chosen](tracked)
+    if chosen is not None:  # --в счётчиках виден алгоритм, который на самом деле сортировал--
+        stats.algorithm = chosen
+    elif keys is not None:
+        ALGORITHMS[algorithm](tracked, keys)
+    else:
+        ALGORITHMS[algorithm](tracked)
+    stats.elapsed += time.perf_counter() - start
+    array[:] = [element.value for element in tracked]
+    if on_event is not None:
+        on_event("done", stats)
+
+
+def _note_pass(array):
+    # --сообщает о новом проходе инструментированному списку; обычный список и его подклассы платят только проверку типа--
+    if isinstance(array, _InstrumentedList):
+        array.note_pass()
+
+
+def _gnome_sort(array, budget=None):
+    """
+    Гномья сортировка: O(n + I), где I — число инверсий.
+
+    Каждый обмен устраняет ровно одну инверсию. Если передан budget и
+    обменов понадобилось больше, сортировка останавливается и возвращает
+    False; список при этом остаётся перестановкой исходного.
+    """
+    _note_pass(array)
+    swaps_left = len(array) ** 2 if budget is None else budget
     index = 0
     while index < len(array):
         if index == 0 or array[index] >= array[index - 1]:
             index += 1
         else:
+            swaps_left -= 1
+            if swaps_left < 0:
+                return False
             array[index], array[index - 1] = array[index - 1], array[index]
             index -= 1
+    return True
+
+
+def _presorted_sort(array, values=None):
+    """
+    Выбирает для адаптивной сортировки гномью, если беспорядок мелкий и частый.
+
+    Длинные серии лучше сливает _adaptive_sort, а много коротких серий при
+    малом числе инверсий (соседние перестановки) гномья сортировка проходит
+    за O(n). Доля мест, где элемент меньше предыдущего, оценивается по
+    выборке из values (по умолчанию — из самого array), а инверсии
+    ограничиваются бюджетом в n / 2 обменов: если его не хватило, сортировку
+    заканчивает _adaptive_sort. Возвращает название алгоритма, который
+    довёл сортировку до конца, или None, если гномья сортировка не подходит.
+    """
+    n = len(array)
+    if n < MIN_MERGE:
+        return None
+    values = array if values is None else values
+    positions = range(1, n, max(1, n // DESCENT_SAMPLE))
+    descents = sum(1 for i in positions if values[i] < values[i - 1])
+    if not descents * GNOME_MIN_RUN <= len(positions) <= descents * GNOME_MAX_RUN:
+        return None
+    if _gnome_sort(array, budget=n // 2):
+        return "gnome"
+    _adaptive_sort(array)
+    return "adaptive"
+
+
+class _MergeState:
+    """Стек естественных серий и текущий порог галопа."""
+
+    def __init__(self):
+        self.runs = []  # --пары (начало, длина)--
+        self.min_gallop = MIN_GALLOP
+
+
+def _adaptive_sort(array):
+    """
+    Адаптивная сортировка слиянием естественных серий (в духе Timsort).
+
+    Уже упорядоченные участки находятся за один проход, короткие серии
+    дополняются бинарными вставками до min_run, а соседние серии
+    сливаются с галопом. Сортировка устойчива, на отсортированном
+    входе выполняет n - 1 сравнений.
+    """
+    n = len(array)
+    _note_pass(array)
+    if n < 2:
+        return
+
+    if n < MIN_MERGE:  # --маленький список: одна серия и вставки--
+        _binary_insertion_sort(array, 0, n, _count_run(array, 0, n))
+        return
+
+    min_run = _min_run_length(n)
+    state = _MergeState()
+    lo = 0
+    while lo < n:
+        run_hi = _count_run(array, lo, n)
+        if run_hi - lo < min_run:  # --короткую серию дополняем вставками--
+            forced_hi = min(lo + min_run, n)
+            _binary_insertion_sort(array, lo, forced_hi, run_hi)
+            run_hi = forced_hi
+        state.runs.append((lo, run_hi - lo))
+        _merge_collapse(array, state)
+        lo = run_hi
+
+    while len(state.runs) > 1:  # --сливаем всё, что осталось на стеке--
+        i = len(state.runs) - 2
+        if i > 0 and state.runs[i - 1][1] < state.runs[i + 1][1]:
+            i -= 1
+        _merge_runs(array, state, i)
+
+
+def _min_run_length(n):
+    # --min_run из [MIN_MERGE / 2, MIN_MERGE], чтобы число серий было близко к степени двойки--
+    remainder = 0
+    while n >= MIN_MERGE:
+        remainder |= n & 1
+        n >>= 1
+    return n + remainder
+
+
+def _count_run(array, lo, hi):
+    """Возвращает конец естественной серии, начинающейся в lo; убывающую серию разворачивает."""
+    run_hi = lo + 1
+    if run_hi == hi:
+        return hi
+
+    if array[run_hi] < array[lo]:  # --строго убывающая серия--
+        run_hi += 1
+        while run_hi < hi and array[run_hi] < array[run_hi - 1]:
+            run_hi += 1
+        array[lo:run_hi] = array[lo:run_hi][::-1]
+    else:  # --неубывающая серия--
+        run_hi += 1
+        while run_hi < hi and not array[run_hi] < array[run_hi - 1]:
+            run_hi += 1
+    return run_hi
+
+
+def _binary_insertion_sort(array, lo, hi, start):
+    """Сортирует array[lo:hi] вставками, если array[lo:start] уже упорядочен."""
+    for i in range(start, hi):
+        pivot = array[i]
+        left, right = lo, i
+        while left < right:
+            middle = (left + right) >> 1
+            if pivot < array[middle]:
+                right = middle
+            else:
+                left = middle + 1
+        array[left + 1:i + 1] = array[left:i]
+        array[left] = pivot
+
+
+def _merge_collapse(array, state):
+    # --поддерживаем инварианты стека серий: длины растут быстрее чисел Фибоначчи--
+    runs = state.runs
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or (
+            i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]
+        ):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            break
+        _merge_runs(array, state, i)
+
+
+def _merge_runs(array, state, i):
+    lo, len_a = state.runs[i]
+    mid, len_b = state.runs[i + 1]
+    state.runs[i] = (lo, len_a + len_b)
+    del state.runs[i + 1]
+    _note_pass(array)
+    _merge(array, lo, mid, mid + len_b, state)
+
+
+def _merge(array, lo, mid, hi, state):
+    """Устойчиво сливает соседние упорядоченные участки array[lo:mid] и array[mid:hi]."""
+    # --начало левой серии и хвост правой уже стоят на своих местах--
+    lo = _gallop_right(array[mid], array, lo, mid)
+    if lo == mid:
+        return
+    hi = _gallop_left(array[mid - 1], array, mid, hi)
+
+    temp = array[lo:mid]
+    len_a = mid - lo
+    i, j, k = 0, mid, lo
+    min_gallop = state.min_gallop
+
+    while i < len_a and j < hi:
+        # --поэлементное слияние, пока одна из серий не начнёт выигрывать подряд--
+        count_a = count_b = 0
+        while i < len_a and j < hi:
+            if array[j] < temp[i]:
+                array[k] = array[j]
+                j += 1
+                count_b += 1
+                count_a = 0
+            else:
+                array[k] = temp[i]
+                i += 1
+                count_a += 1
+                count_b = 0
+            k += 1
+            if count_a >= min_gallop or count_b >= min_gallop:
+                break
+
+        # --галоп: переносим целые блоки, найденные экспоненциальным поиском--
+        while i < len_a and j < hi:
+            end = _gallop_right(array[j], temp, i, len_a)
+            taken_a = end - i
+            array[k:k + taken_a] = temp[i:end]
+            k += taken_a
+            i = end
+            if i == len_a:
+                break
+
+            end = _gallop_left(temp[i], array, j, hi)
+            taken_b = end - j
+            array[k:k + taken_b] = array[j:end]
+            k += taken_b
+            j = end
+            if j == hi:
+                break
+
+            if taken_a < MIN_GALLOP and taken_b < MIN_GALLOP:
+                min_gallop += 1  # --галоп не окупается, выходим из него--
+                break
+            min_gallop = max(1, min_gallop - 1)
+
+    array[k:k + len_a - i] = temp[i:]  # --остаток правой серии уже на месте--
+    state.min_gallop = min_gallop
+
+
+def _gallop_left(key, array, lo, hi):
+    """Первая позиция в упорядоченном array[lo:hi], где элемент не меньше key."""
+    if lo == hi or not array[lo] < key:
+        return lo
+    length = hi - lo
+    last, offset = 0, 1
+    while offset < length and array[lo + offset] < key:
+        last = offset
+        offset = (offset << 1) + 1
+    left, right = lo + last + 1, lo + min(offset, length)
+    while left < right:
+        middle = (left + right) >> 1
+        if array[middle] < key:
+            left = middle + 1
+        else:
+            right = middle
+    return left
+
+
+def _gallop_right(key, array, lo, hi):
+    """Первая позиция в упорядоченном array[lo:hi], где элемент больше key."""
+    if lo == hi or key < array[lo]:
+        return lo
+    length = hi - lo
+    last, offset = 0, 1
+    while offset < length and not key < array[lo + offset]:
+        last = offset
+        offset = (offset << 1) + 1
+    left, right = lo + last + 1, lo + min(offset, length)
+    while left < right:
+        middle = (left + right) >> 1
+        if key < array[middle]:
+            right = middle
+        else:
+            left = middle + 1
+    return left
+
+
+def _integer_sort(array, kinds):
+    """
+    Сортирует целые без сравнений, если их размах невелик относительно n.
+
+    Узкий диапазон — подсчётом за O(n + k), где k — размах, широкий —
+    поразрядно за несколько проходов. Возвращает False, если ни то, ни
+    другое не выгоднее адаптивной сортировки.
+    """
+    algorithm = _integer_algorithm(array, kinds)
+    if algorithm is None:
+        return False
+    ALGORITHMS[algorithm](array)
+    return True
+
+
+def _integer_algorithm(values, kinds):
+    n = len(values)
+    if kinds != {int} or n < INTEGER_THRESHOLD:
+        return None
+    span = max(values) - min(values) + 1
+    if span <= COUNTING_RANGE_FACTOR * n:
+        return "counting"
+    if span.bit_length() <= RADIX_MAX_PASSES * _radix_bits(n):
+        return "radix"
+    return None
+
+
+def _integer_keys(array):
+    try:
+        return list(map(_as_int, array))
+    except TypeError:
+        raise ValueError("Сортировка подсчётом и поразрядная сортировка применимы только к целым числам") from None
+
+
+def _counting_sort(array, keys=None):
+    """
+    Устойчивая сортировка подсчётом; отрицательные сдвигаются на минимум.
+
+    Если переданы keys, упорядочивается array по ним — так строится
+    перестановка для sort(..., key=...). При размахе, для которого
+    таблица счётчиков была бы огромной, работа передаётся _radix_sort.
+    """
+    plain = keys is None and set(map(type, array)) == {int}
+    if keys is None:
+        keys = _integer_keys(array)
+    if len(keys) < 2:
+        return array
+    lo = min(keys)
+    span = max(keys) - lo + 1
+    if span > max(COUNTING_RANGE_FACTOR * len(keys), 1 << 16):
+        return _radix_sort(array, None if plain else keys)
+    counts = [0] * span
+    for key in keys:
+        counts[key - lo] += 1
+    _note_pass(array)
+    if plain:  # --равные int неотличимы: список восстанавливается прямо из счётчиков--
+        array[:] = chain.from_iterable(repeat(lo + offset, count) for offset, count in enumerate(counts) if count)
+        return array
+    start = 0
+    for offset, count in enumerate(counts):  # --счётчики превращаются в позиции начала групп--
+        counts[offset] = start
+        start += count
+    result = [None] * len(keys)
+    for item, key in zip(array, keys):
+        slot = key - lo
+        result[counts[slot]] = item
+        counts[slot] += 1
+    array[:] = result
+    return array
+
+
+def _radix_sort(array, keys=None):
+    """
+    Поразрядная сортировка LSD с основанием около n; отрицательные сдвигаются на минимум.
+
+    Каждый проход раскладывает элементы по корзинам очередного разряда
+    с сохранением порядка, поэтому сортировка устойчива.
+    """
+    plain = keys is None and set(map(type, array)) == {int}
+    if keys is None:
+        keys = _integer_keys(array)
+    if len(keys) < 2:
+        return array
+    lo = min(keys)
+    span = max(keys) - lo
+    bits = _radix_bits(len(keys))
+    mask = (1 << bits) - 1
+    shift = 0
+    if plain:
+        items = [key - lo for key in keys]
+        while span >> shift:
+            buckets = [[] for _ in range(mask + 1)]
+            for item in items:
+                buckets[(item >> shift) & mask].append(item)
+            items = list(chain.from_iterable(buckets))
+            shift += bits
+            _note_pass(array)
+        array[:] = [item + lo for item in items]
+        return array
+    items = list(zip([key - lo for key in keys], array))
+    while span >> shift:
+        buckets = [[] for _ in range(mask + 1)]
+        for item in items:
+            buckets[(item[0] >> shift) & mask].append(item)
+        items = list(chain.from_iterable(buckets))
+        shift += bits
+        _note_pass(array)
+    array[:] = [item for _, item in items]
     return array
 
+
+def _radix_bits(n):
+    # --корзин примерно столько же, сколько элементов, но не меньше 2**8 и не больше 2**16--
+    return max(8, min(16, n.bit_length()))
+
+
+ALGORITHMS = {
+    "adaptive": _adaptive_sort,
+    "gnome": _gnome_sort,
+    "counting": _counting_sort,
+    "radix": _radix_sort,
+}
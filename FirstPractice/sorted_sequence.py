@@ -0,0 +1,191 @@
+"""
+Отсортированная последовательность чисел с быстрыми вставками и удалениями.
+
+Вместо пересортировки всего списка после каждого нового значения числа
+хранятся блоками: списком отсортированных кусков ограниченной длины и
+списком их максимумов. Поиск куска — бинарный поиск по максимумам,
+вставка и удаление внутри куска стоят O(LOAD).
+"""
+from bisect import bisect_left, bisect_right, insort_right
+from itertools import chain
+
+from gnome_sort import _check_numbers, sort
+
+LOAD = 1000  # --куски длиннее 2 * LOAD делятся пополам--
+
+
+class SortedSequence:
+    """Последовательность чисел, которая остаётся упорядоченной после add, remove и pop."""
+
+    def __init__(self, iterable=(), load=LOAD):
+        if not isinstance(load, int) or load < 2:
+            raise ValueError("Размер куска должен быть целым числом не меньше 2")
+        self._load = load
+        self._rebuild(iterable)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return chain.from_iterable(map(reversed, reversed(self._lists)))
+
+    def __contains__(self, value):
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return False
+        chunk = self._lists[pos]
+        index = bisect_left(chunk, value)
+        return chunk[index] == value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        pos, offset = self._locate(index)
+        return self._lists[pos][offset]
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            values = list(self)
+            del values[index]
+            self._rebuild(values)
+            return
+        pos, offset = self._locate(index)
+        self._delete(pos, offset)
+
+    def __eq__(self, other):
+        if isinstance(other, SortedSequence):
+            return self._len == other._len and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SortedSequence({list(self)!r})"
+
+    def add(self, value):
+        """Вставляет число, сохраняя порядок; равные значения встают после уже имеющихся."""
+        if not isinstance(value, (int, float)):
+            raise ValueError("Все элементы списка должны быть числами")
+        if not self._lists:
+            self._lists.append([value])
+            self._maxes.append(value)
+        else:
+            pos = bisect_right(self._maxes, value)
+            if pos == len(self._maxes):  # --больше всех: в конец последнего куска--
+                pos -= 1
+                self._lists[pos].append(value)
+                self._maxes[pos] = value
+            else:
+                insort_right(self._lists[pos], value)
+            if len(self._lists[pos]) > 2 * self._load:
+                self._split(pos)
+        self._len += 1
+        self._offsets = None
+
+    def update(self, iterable):
+        values = list(iterable)
+        _check_numbers(values)
+        if len(values) * 4 >= self._len:  # --крупная пачка: дешевле пересобрать--
+            self._rebuild(chain(self, values))
+        else:
+            for value in values:
+                self.add(value)
+
+    def discard(self, value):
+        """Удаляет одно вхождение value, если оно есть."""
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return False
+        chunk = self._lists[pos]
+        offset = bisect_left(chunk, value)
+        if chunk[offset] != value:
+            return False
+        self._delete(pos, offset)
+        return True
+
+    def remove(self, value):
+        if not self.discard(value):
+            raise ValueError(f"{value!r} отсутствует в последовательности")
+
+    def pop(self, index=-1):
+        pos, offset = self._locate(index)
+        value = self._lists[pos][offset]
+        self._delete(pos, offset)
+        return value
+
+    def bisect_left(self, value):
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._start(pos) + bisect_left(self._lists[pos], value)
+
+    def bisect_right(self, value):
+        pos = bisect_right(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._start(pos) + bisect_right(self._lists[pos], value)
+
+    def count(self, value):
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def index(self, value):
+        position = self.bisect_left(value)
+        if position == self._len or self[position] != value:
+            raise ValueError(f"{value!r} отсутствует в последовательности")
+        return position
+
+    def _rebuild(self, iterable):
+        values = list(iterable)
+        _check_numbers(values)
+        sort(values, validate="off")
+        self._lists = [values[start:start + self._load] for start in range(0, len(values), self._load)]
+        self._maxes = [chunk[-1] for chunk in self._lists]
+        self._len = len(values)
+        self._offsets = None  # --начала кусков; пересчитываются лениво после изменений--
+
+    def _split(self, pos):
+        chunk = self._lists[pos]
+        half = chunk[self._load:]
+        del chunk[self._load:]
+        self._lists.insert(pos + 1, half)
+        self._maxes[pos] = chunk[-1]
+        self._maxes.insert(pos + 1, half[-1])
+
+    def _delete(self, pos, offset):
+        chunk = self._lists[pos]
+        del chunk[offset]
+        self._len -= 1
+        self._offsets = None
+        if not chunk:
+            del self._lists[pos]
+            del self._maxes[pos]
+            return
+        self._maxes[pos] = chunk[-1]
+        if len(chunk) < self._load // 2 and len(self._lists) > 1:  # --слишком короткий кусок сливаем с соседом--
+            neighbour = pos - 1 if pos > 0 else pos
+            self._lists[neighbour].extend(self._lists[neighbour + 1])
+            del self._lists[neighbour + 1]
+            del self._maxes[neighbour]
+            if len(self._lists[neighbour]) > 2 * self._load:
+                self._split(neighbour)
+
+    def _start(self, pos):
+        if self._offsets is None:
+            offsets, total = [], 0
+            for chunk in self._lists:
+                offsets.append(total)
+                total += len(chunk)
+            self._offsets = offsets
+        return self._offsets[pos]
+
+    def _locate(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("Индекс вне последовательности")
+        if len(self._lists) == 1:
+            return 0, index
+        self._start(0)
+        pos = bisect_right(self._offsets, index) - 1
+        return pos, index - self._offsets[pos]
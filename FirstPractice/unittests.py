@@ -1,5 +1,23 @@
+import bisect
+import collections
+import errno
+import json
+import locale
+import os
+import random
+import tempfile
+import tracemalloc
 import unittest
-from gnome_sort import sort
+from array import array
+from unittest import mock
+
+import benchmark
+import external_sort
+import gnome_sort
+from external_sort import sort_file, sort_stream
+from gnome_sort import (SortStats, argsort, inversions, iter_sorted, largest, lexsort, runs, select, smallest, sort,
+                        sort_many, take)
+from sorted_sequence import SortedSequence
 
 class TestGnomeSort(unittest.TestCase):
     
@@ -29,6 +47,17 @@ class TestGnomeSort(unittest.TestCase):
         """Тесты для смешанных отрицательных и положительных чисел"""
         self.assertEqual(sort([-3, 0, 2, -1, 4]), [-3, -1, 0, 2, 4])
     
+    def test_sort_list_subclass(self):
+        """Тесты для сортировки подкласса списка"""
+        class MyList(list):
+            pass
+
+        for algorithm in gnome_sort.ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                data = MyList([3, 1, 2, 5, 4, 0])
+                self.assertIs(sort(data, algorithm=algorithm), data)
+                self.assertEqual(data, [0, 1, 2, 3, 4, 5])
+
     def test_sort_type_error(self):
         """Тесты для проверки ошибки TypeError"""
         with self.assertRaises(TypeError):
@@ -39,5 +68,811 @@ class TestGnomeSort(unittest.TestCase):
         with self.assertRaises(ValueError):
             sort([1, 2, 'three', 4])
 
+
+class TestSortAlgorithms(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(42)
+        cls.random_list = [rng.randint(-1000, 1000) for _ in range(5000)]
+        cls.nearly_sorted = list(range(5000))
+        for _ in range(50):
+            i, j = rng.randrange(5000), rng.randrange(5000)
+            cls.nearly_sorted[i], cls.nearly_sorted[j] = cls.nearly_sorted[j], cls.nearly_sorted[i]
+
+    def test_adaptive_matches_builtin(self):
+        """Адаптивная сортировка совпадает со встроенной на разных входах"""
+        for data in (self.random_list, self.nearly_sorted, sorted(self.random_list),
+                     sorted(self.random_list, reverse=True)):
+            self.assertEqual(sort(list(data)), sorted(data))
+
+    def test_every_algorithm_sorts(self):
+        """Каждый алгоритм из селектора сортирует одинаково"""
+        data = self.random_list[:300]
+        for algorithm in ("adaptive", "gnome"):
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(sort(list(data), algorithm=algorithm), sorted(data))
+
+    def test_adaptive_is_stable(self):
+        """Равные int и float сохраняют исходный порядок"""
+        data = [1, 2.0, 1.0, 2, 1] * 200
+        result = sort(list(data))
+        self.assertEqual([type(x) for x in result], [type(x) for x in sorted(data)])
+
+    def test_sort_in_place(self):
+        """Сортировка выполняется на месте"""
+        data = [3, 1, 2]
+        self.assertIs(sort(data), data)
+        self.assertEqual(data, [1, 2, 3])
+
+    def test_unknown_algorithm(self):
+        """Неизвестный алгоритм вызывает ValueError"""
+        with self.assertRaises(ValueError):
+            sort([3, 1, 2], algorithm="bogo")
+
+
+class TestNumpyFastPath(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.ints = [rng.randint(-10**6, 10**6) for _ in range(gnome_sort.NUMPY_THRESHOLD * 2)]
+        self.floats = [rng.uniform(-1e3, 1e3) for _ in range(gnome_sort.NUMPY_THRESHOLD * 2)]
+
+    @unittest.skipIf(gnome_sort.numpy is None, "NumPy не установлен")
+    def test_numpy_path_keeps_python_types(self):
+        """Результат векторной сортировки снова состоит из int и float"""
+        for data in (self.ints, self.floats):
+            result = sort(list(data))
+            self.assertEqual(result, sorted(data))
+            self.assertEqual({type(x) for x in result}, {type(data[0])})
+
+    @unittest.skipIf(gnome_sort.numpy is None, "NumPy не установлен")
+    def test_as_ndarray(self):
+        """По запросу возвращается ndarray, список не меняется"""
+        data = list(self.floats)
+        result = sort(data, as_ndarray=True)
+        self.assertIsInstance(result, gnome_sort.numpy.ndarray)
+        self.assertEqual(result.tolist(), sorted(self.floats))
+        self.assertEqual(data, self.floats)
+
+    @unittest.skipIf(gnome_sort.numpy is None, "NumPy не установлен")
+    def test_huge_ints_fall_back(self):
+        """Целые вне int64 сортируются чистым Python"""
+        data = [2 ** 70 - i for i in range(gnome_sort.NUMPY_THRESHOLD)]
+        self.assertEqual(sort(list(data)), sorted(data))
+
+    def test_mixed_input_falls_back(self):
+        """Смешанные int и float сортируются устойчиво чистым Python"""
+        data = [1, 1.0] * gnome_sort.NUMPY_THRESHOLD
+        result = sort(list(data))
+        self.assertEqual([type(x) for x in result], [type(x) for x in sorted(data)])
+
+    def test_without_numpy(self):
+        """Без NumPy работает чистый Python, а as_ndarray недоступен"""
+        with mock.patch.object(gnome_sort, "numpy", None):
+            self.assertEqual(sort(list(self.ints)), sorted(self.ints))
+            with self.assertRaises(ImportError):
+                sort(list(self.ints), as_ndarray=True)
+
+
+class _Priced:
+    """Объект со свойством, которое считает свои вызовы"""
+
+    calls = 0
+
+    def __init__(self, name, cost):
+        self.name = name
+        self._cost = cost
+
+    @property
+    def cost(self):
+        _Priced.calls += 1
+        return self._cost
+
+
+class TestKeyAndReverse(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(21)
+        self.items = [_Priced(f"item{i}", rng.randint(0, 20)) for i in range(300)]
+        _Priced.calls = 0
+
+    def test_key_computed_once(self):
+        """Ключ вычисляется ровно один раз для каждого элемента"""
+        for algorithm in gnome_sort.ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                _Priced.calls = 0
+                result = sort(list(self.items), algorithm=algorithm, key=lambda item: item.cost)
+                self.assertEqual(_Priced.calls, len(self.items))
+                self.assertEqual([item.name for item in result],
+                                 [item.name for item in sorted(self.items, key=lambda item: item._cost)])
+
+    def test_reverse_is_stable(self):
+        """При reverse=True равные ключи сохраняют исходный порядок"""
+        expected = sorted(self.items, key=lambda item: item._cost, reverse=True)
+        result = sort(list(self.items), key=lambda item: item.cost, reverse=True)
+        self.assertEqual([item.name for item in result], [item.name for item in expected])
+        data = [1, 2.0, 1.0, 2, 3]
+        self.assertEqual([(x, type(x)) for x in sort(list(data), reverse=True)],
+                         [(x, type(x)) for x in sorted(data, reverse=True)])
+
+    def test_reverse_buffer(self):
+        """Буфер сортируется по убыванию и по ключу"""
+        self.assertEqual(sort(array("i", [3, -1, 2]), reverse=True).tolist(), [3, 2, -1])
+        self.assertEqual(sort(array("i", [3, -1, 2]), key=abs).tolist(), [-1, 2, 3])
+
+    def test_key_with_stats(self):
+        """Счётчики работают и при сортировке по ключу"""
+        stats = SortStats()
+        sort(list(self.items), algorithm="gnome", key=lambda item: item.cost, stats=stats)
+        self.assertGreater(stats.comparisons, 0)
+
+    def test_key_validation(self):
+        """Ключи проверяются теми же правилами, что и элементы"""
+        with self.assertRaises(ValueError):
+            sort(list(self.items), key=lambda item: item.name)
+        self.assertEqual(len(sort(list(self.items), key=lambda item: item.name, validate="off")), 300)
+        with self.assertRaises(ValueError):
+            sort([1, 2], key=abs, as_ndarray=True)
+
+
+class TestIntegerSort(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(11)
+
+    def test_matches_builtin(self):
+        """Подсчёт и поразрядная сортировка совпадают с sorted, в том числе с отрицательными"""
+        for algorithm in gnome_sort.INTEGER_ALGORITHMS:
+            for size in (0, 1, 7, 500):
+                for span in (3, 2 * size + 1, 2 ** 40):
+                    data = [self.rng.randint(-span, span) for _ in range(size)]
+                    with self.subTest(algorithm=algorithm, size=size, span=span):
+                        self.assertEqual(sort(list(data), algorithm=algorithm), sorted(data))
+
+    def test_stable_for_bool_and_key(self):
+        """Равные ключи сохраняют исходный порядок: True и 1, False и 0 не переставляются"""
+        data = [True, 1, 0, False, 1, True, 0] * 40
+        expected = sorted(data)
+        for algorithm in gnome_sort.INTEGER_ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual([(x, type(x)) for x in sort(list(data), algorithm=algorithm)],
+                                 [(x, type(x)) for x in expected])
+                items = [(self.rng.randint(-5, 5), i) for i in range(300)]
+                result = sort(list(items), algorithm=algorithm, key=lambda item: item[0], reverse=True)
+                self.assertEqual(result, sorted(items, key=lambda item: item[0], reverse=True))
+
+    def test_rejects_floats(self):
+        """Для float явный выбор подсчёта — ошибка"""
+        for algorithm in gnome_sort.INTEGER_ALGORITHMS:
+            with self.subTest(algorithm=algorithm), self.assertRaises(ValueError):
+                sort([2, 1.5, 1], algorithm=algorithm)
+
+    def test_default_picks_integer_path(self):
+        """sort() по умолчанию сортирует узкий диапазон целых подсчётом, а широкий — сравнениями"""
+        narrow = [self.rng.randint(-100, 100) for _ in range(1000)]
+        wide = [self.rng.randint(-2 ** 80, 2 ** 80) for _ in range(1000)]
+        counting = mock.Mock(wraps=gnome_sort._counting_sort)
+        with mock.patch.object(gnome_sort, "numpy", None), mock.patch.dict(gnome_sort.ALGORITHMS, counting=counting):
+            self.assertEqual(sort(list(narrow)), sorted(narrow))
+            self.assertEqual(counting.call_count, 1)
+            self.assertEqual(sort(list(wide)), sorted(wide))
+            self.assertEqual(sort(array("q", narrow)).tolist(), sorted(narrow))
+            self.assertEqual(counting.call_count, 2)
+
+    def test_counts_without_comparisons(self):
+        """Подсчёт не сравнивает элементы"""
+        stats = SortStats()
+        data = [self.rng.randint(-50, 50) for _ in range(300)]
+        self.assertEqual(sort(list(data), algorithm="counting", stats=stats), sorted(data))
+        self.assertEqual((stats.algorithm, stats.comparisons, stats.passes), ("counting", 0, 1))
+
+
+class TestSortMany(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(12)
+        self.lists = [[rng.choice([rng.randint(-50, 50), rng.uniform(-50, 50)]) for _ in range(rng.randint(0, 40))]
+                      for _ in range(200)]
+
+    def test_per_list(self):
+        """Каждый список сортируется на месте, возвращается тот же внешний список"""
+        lists = [list(values) for values in self.lists]
+        inner = lists[0]
+        self.assertIs(sort_many(lists), lists)
+        self.assertIs(lists[0], inner)
+        self.assertEqual(lists, [sorted(values) for values in self.lists])
+
+    def test_flat_offsets(self):
+        """flat=True возвращает общий список и границы, не трогая вход"""
+        lists = [list(values) for values in self.lists]
+        flat, offsets = sort_many(lists, flat=True)
+        self.assertEqual(lists, self.lists)
+        self.assertEqual(len(offsets), len(lists) + 1)
+        self.assertEqual([flat[offsets[i]:offsets[i + 1]] for i in range(len(lists))],
+                         [sorted(values) for values in self.lists])
+        self.assertEqual(sort_many([], flat=True), ([], [0]))
+
+    def test_stable_and_algorithms(self):
+        """Равные int и float сохраняют порядок при любом алгоритме"""
+        lists = [[2, 1.0, 1, 2.0, 0] * 10, [1.0, 1], [3]]
+        for algorithm in ("adaptive", "gnome"):
+            with self.subTest(algorithm=algorithm):
+                result = sort_many([list(values) for values in lists], algorithm=algorithm)
+                self.assertEqual([[(x, type(x)) for x in values] for values in result],
+                                 [[(x, type(x)) for x in sorted(values)] for values in lists])
+
+    def test_validation(self):
+        """Одна проверка на все списки: нечисло в любом из них — ошибка"""
+        with self.assertRaises(ValueError):
+            sort_many([[1, 2], [3, "4"]])
+        with self.assertRaises(TypeError):
+            sort_many([[1, 2], (3, 4)])
+        with self.assertRaises(TypeError):
+            sort_many("12")
+
+    @unittest.skipIf(gnome_sort.numpy is None, "NumPy не установлен")
+    def test_numpy_segments(self):
+        """С NumPy однородные списки сортируются одной сегментной сортировкой"""
+        rng = random.Random(3)
+        lists = [[rng.randint(-10 ** 12, 10 ** 12) for _ in range(rng.randint(0, 30))] for _ in range(300)]
+        flat, offsets = sort_many(lists, flat=True)
+        self.assertEqual([flat[offsets[i]:offsets[i + 1]] for i in range(len(lists))],
+                         [sorted(values) for values in lists])
+
+
+class TestArgsort(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(13)
+        self.costs = [rng.randint(0, 20) for _ in range(500)]
+        self.weights = [rng.choice([rng.randint(0, 5), rng.uniform(0, 5)]) for _ in range(500)]
+        self.names = [f"item{i}" for i in range(500)]
+
+    def test_argsort_is_stable(self):
+        """argsort совпадает с устойчивой сортировкой индексов, в том числе в обратном порядке"""
+        indices = range(len(self.costs))
+        for algorithm in gnome_sort.ALGORITHMS:
+            if algorithm == "gnome":
+                continue
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(argsort(self.costs, algorithm=algorithm),
+                                 sorted(indices, key=self.costs.__getitem__))
+                self.assertEqual(argsort(self.costs, algorithm=algorithm, reverse=True),
+                                 sorted(indices, key=self.costs.__getitem__, reverse=True))
+        self.assertEqual(argsort(self.weights), sorted(indices, key=self.weights.__getitem__))
+        self.assertEqual(self.costs[:3], [self.costs[0], self.costs[1], self.costs[2]])
+
+    def test_lexsort_first_key_primary(self):
+        """lexsort упорядочивает как сортировка кортежей: первый ключ главный"""
+        order = lexsort(self.costs, self.weights)
+        expected = sorted(range(len(self.costs)), key=lambda i: (self.costs[i], self.weights[i]))
+        self.assertEqual(order, expected)
+        self.assertEqual(take(self.names, order), [self.names[i] for i in expected])
+        self.assertEqual(lexsort([2, 1, 2, 1]), [1, 3, 0, 2])
+
+    def test_buffers_and_take(self):
+        """Ключи могут быть буферами, take сохраняет тип array.array"""
+        costs = array("q", self.costs)
+        order = lexsort(costs, array("d", self.weights))
+        self.assertEqual(order, lexsort(self.costs, self.weights))
+        gathered = take(costs, order)
+        self.assertIsInstance(gathered, array)
+        self.assertEqual(gathered.tolist(), sorted(self.costs))
+
+    def test_errors(self):
+        """Разная длина ключей, пустой список ключей и нечисла — ошибки"""
+        with self.assertRaises(ValueError):
+            lexsort([1, 2], [1])
+        with self.assertRaises(ValueError):
+            lexsort()
+        with self.assertRaises(ValueError):
+            argsort([1, "2"])
+        with self.assertRaises(TypeError):
+            argsort("12")
+
+
+class TestPresortedness(unittest.TestCase):
+
+    @staticmethod
+    def _local_swaps(n, every):
+        data = [float(i) for i in range(n)]
+        for i in range(0, n - 1, every):
+            data[i], data[i + 1] = data[i + 1], data[i]
+        return data
+
+    def test_inversions_and_runs(self):
+        """inversions совпадает с перебором пар, runs считает неубывающие серии"""
+        rng = random.Random(14)
+        for size in (0, 1, 2, 50, 300):
+            data = [rng.choice([rng.randint(0, 9), rng.uniform(0, 9)]) for _ in range(size)]
+            expected = sum(1 for i in range(size) for j in range(i + 1, size) if data[i] > data[j])
+            with self.subTest(size=size):
+                copy = list(data)
+                self.assertEqual(inversions(data), expected)
+                self.assertEqual(data, copy)
+        self.assertEqual(inversions(array("d", [3, 2, 1])), 3)
+        self.assertEqual([runs([]), runs([1, 1, 2]), runs([3, 2, 1]), runs(array("q", [1, 2, 0, 3]))], [0, 1, 3, 2])
+        with self.assertRaises(ValueError):
+            inversions([1, "2"])
+
+    def test_gnome_for_local_disorder(self):
+        """Частые соседние перестановки сортирует гномья сортировка за n + 2I сравнений"""
+        data = self._local_swaps(2000, 8)
+        stats = SortStats()
+        self.assertEqual(sort(list(data), stats=stats), sorted(data))
+        self.assertEqual(stats.algorithm, "gnome")
+        self.assertEqual(stats.swaps, inversions(data))
+        self.assertEqual(sort(list(data)), sorted(data))
+
+    def test_adaptive_otherwise(self):
+        """Длинные серии, случайный вход и исчерпанный бюджет обменов остаются адаптивной сортировке"""
+        rng = random.Random(15)
+        far = self._local_swaps(2000, 8)
+        far.insert(0, far.pop())  # --мелкий беспорядок плюс один элемент через весь список--
+        cases = {
+            "sorted": [float(i) for i in range(2000)],
+            "long runs": self._local_swaps(2000, 100),
+            "random": [rng.random() for _ in range(2000)],
+            "budget": far,
+        }
+        for name, data in cases.items():
+            with self.subTest(name=name):
+                stats = SortStats()
+                self.assertEqual(sort(list(data), stats=stats), sorted(data))
+                self.assertEqual(stats.algorithm, "adaptive")
+                self.assertEqual(sort(list(data)), sorted(data))
+
+
+class TestCollation(unittest.TestCase):
+
+    def setUp(self):
+        self.names = ["Яйца", "ёлка", "Ель", "Ёж", "жир", "Мука", "мука", "Сахар", "еда", "ЖЕЛЕ"]
+
+    def test_russian_order(self):
+        """«ё» стоит между «е» и «ж», регистр не важен, равные сохраняют порядок"""
+        self.assertEqual(sort(list(self.names), collation="ru"),
+                         ["еда", "Ель", "Ёж", "ёлка", "ЖЕЛЕ", "жир", "Мука", "мука", "Сахар", "Яйца"])
+        self.assertEqual(sort(list(self.names), collation="ru", reverse=True),
+                         ["Яйца", "Сахар", "Мука", "мука", "жир", "ЖЕЛЕ", "ёлка", "Ёж", "Ель", "еда"])
+
+    def test_keys_cached(self):
+        """Ключ сравнения вычисляется один раз на каждую различную строку"""
+        rng = random.Random(15)
+        names = [rng.choice(self.names) for _ in range(5000)]
+        collate = mock.Mock(side_effect=gnome_sort.russian_collation)
+        result = sort(list(names), collation=collate)
+        self.assertEqual(collate.call_count, len(set(names)))
+        self.assertEqual(result, sorted(names, key=gnome_sort.russian_collation))
+
+    def test_key_and_locale(self):
+        """collation применяется к значениям key; доступен порядок текущей локали"""
+        items = [(name, i) for i, name in enumerate(self.names)]
+        result = sort(list(items), key=lambda item: item[0], collation="ru")
+        self.assertEqual(result, sorted(items, key=lambda item: gnome_sort.russian_collation(item[0])))
+        self.assertEqual(sort(list(self.names), collation="locale"), sorted(self.names, key=locale.strxfrm))
+
+    def test_errors(self):
+        """Смешанный список, неизвестная схема и буфер с collation — ошибки"""
+        with self.assertRaises(ValueError):
+            sort(["Мука", 1], collation="ru")
+        with self.assertRaises(ValueError):
+            sort(list(self.names))
+        with self.assertRaises(ValueError):
+            sort(list(self.names), collation="klingon")
+        with self.assertRaises(TypeError):
+            sort(array("d", [1.0]), collation="ru")
+
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(17)
+        self.data = [rng.randint(-500, 500) for _ in range(2000)] + [7.0, 7]
+        self.expected = sorted(self.data)
+
+    def test_smallest_and_largest(self):
+        """smallest и largest совпадают с началом полной сортировки"""
+        for k in (0, 1, 10, len(self.data) + 1):
+            with self.subTest(k=k):
+                self.assertEqual(smallest(self.data, k), self.expected[:k])
+                self.assertEqual(largest(self.data, k), sorted(self.data, reverse=True)[:k])
+
+    def test_top_by_key(self):
+        """Самые дешёвые объекты выбираются по ключу без копирования значений"""
+        items = [_Priced(f"item{i}", cost) for i, cost in enumerate([5, 1, 3, 1, 9])]
+        self.assertEqual([item.name for item in smallest(items, 2, key=lambda item: item.cost)],
+                         ["item1", "item3"])
+        self.assertEqual([item.name for item in largest(items, 1, key=lambda item: item.cost)], ["item4"])
+
+    def test_select(self):
+        """select возвращает элемент отсортированного списка по индексу"""
+        for index in (0, 1, 999, 1000, len(self.data) - 1, -1, -2000):
+            with self.subTest(index=index):
+                self.assertEqual(select(self.data, index), self.expected[index])
+        organ_pipe = list(range(3000)) + list(range(3000, 0, -1))
+        self.assertEqual(select(organ_pipe, 3000), sorted(organ_pipe)[3000])
+        self.assertEqual(select(array("d", [3.0, 1.0, 2.0]), 1), 2.0)
+
+    def test_iter_sorted_is_lazy(self):
+        """iter_sorted отдаёт элементы по порядку и может быть прерван"""
+        iterator = iter_sorted(self.data)
+        self.assertEqual([next(iterator) for _ in range(5)], self.expected[:5])
+        result = list(iter_sorted(self.data))
+        self.assertEqual([(x, type(x)) for x in result], [(x, type(x)) for x in self.expected])
+
+    def test_validation(self):
+        """Выбор следует тем же правилам проверки, что и sort"""
+        with self.assertRaises(TypeError):
+            smallest("not a list", 2)
+        with self.assertRaises(ValueError):
+            largest([1, 2, 'three', 4], 2)
+        with self.assertRaises(ValueError):
+            iter_sorted([1, 2, 'three', 4])
+        with self.assertRaises(ValueError):
+            smallest([1, 2], -1)
+        with self.assertRaises(IndexError):
+            select([1, 2], 2)
+
+
+class TestTypedBuffers(unittest.TestCase):
+
+    def test_array_sorted_in_place(self):
+        """array.array сортируется на месте без поэлементной проверки"""
+        for typecode, data in (("d", [4.2, 2.1, 7.5, 1.0]), ("i", [3, -1, -4, 2, 0]), ("q", [5, 4, 3])):
+            with self.subTest(typecode=typecode):
+                buffer = array(typecode, data)
+                self.assertIs(sort(buffer), buffer)
+                self.assertEqual(buffer.tolist(), sorted(data))
+
+    def test_memoryview_and_bytearray(self):
+        """memoryview и bytearray сортируются через протокол буфера"""
+        backing = array("d", [3.0, 1.0, 2.0])
+        view = memoryview(backing)
+        self.assertIs(sort(view, algorithm="gnome"), view)
+        self.assertEqual(backing.tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(sort(bytearray(b"cab")), bytearray(b"abc"))
+
+    def test_invalid_buffers(self):
+        """Буферы только для чтения, многомерные и нечисловые отклоняются"""
+        with self.assertRaises(TypeError):
+            sort(b"cab")
+        with self.assertRaises(TypeError):
+            sort(memoryview(bytearray(4)).cast("B", (2, 2)))
+        with self.assertRaises(ValueError):
+            sort(array("u", "cab"))
+
+
+class TestValidationModes(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.data = [rng.uniform(-100, 100) for _ in range(500)]
+
+    def test_modes_sort_valid_input(self):
+        """Все режимы одинаково сортируют корректный список"""
+        for validate in ("strict", "off"):
+            with self.subTest(validate=validate):
+                self.assertEqual(sort(list(self.data), validate=validate), sorted(self.data))
+
+    def test_subclasses_of_numbers_allowed(self):
+        """Подклассы int и float по-прежнему считаются числами"""
+        self.assertEqual(sort([True, 2, 0.5]), [0.5, True, 2])
+
+    def test_unknown_mode(self):
+        """Неизвестный режим проверки вызывает ValueError"""
+        for validate in ("lazy", "fused"):
+            with self.subTest(validate=validate), self.assertRaises(ValueError):
+                sort([1], validate=validate)
+
+
+class TestExternalSort(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.values = [rng.uniform(0, 1000) for _ in range(3000)]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_stream_in_memory(self):
+        """Небольшой поток сортируется без временных файлов"""
+        self.assertEqual(list(sort_stream(iter(self.values))), sorted(self.values))
+        self.assertEqual(list(sort_stream([])), [])
+
+    def test_stream_spills_runs(self):
+        """При маленьком лимите памяти поток режется на серии и сливается"""
+        result = sort_stream(self.values, memory_limit=1024, tmpdir=self.directory.name)
+        self.assertEqual(list(result), sorted(self.values))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_multi_pass_merge(self):
+        """Серий больше MAX_FAN_IN — слияние идёт в несколько проходов"""
+        ints = [random.randint(-50, 50) for _ in range(2000)]
+        with mock.patch.object(external_sort, "MAX_FAN_IN", 3):
+            result = list(sort_stream(ints, dtype="q", memory_limit=400))
+        self.assertEqual(result, sorted(ints))
+
+    def test_sort_file(self):
+        """Двоичный файл сортируется через mmap в файл результата"""
+        src = os.path.join(self.directory.name, "prices.bin")
+        dst = os.path.join(self.directory.name, "sorted.bin")
+        with open(src, "wb") as source:
+            array("d", self.values).tofile(source)
+        for memory_limit in (1024, external_sort.DEFAULT_MEMORY_LIMIT):
+            with self.subTest(memory_limit=memory_limit):
+                self.assertEqual(sort_file(src, dst, memory_limit=memory_limit), len(self.values))
+                result = array("d")
+                with open(dst, "rb") as output:
+                    result.frombytes(output.read())
+                self.assertEqual(result.tolist(), sorted(self.values))
+
+    def test_memory_limit(self):
+        """Пик памяти при сортировке файла и потока не превышает лимит"""
+        rng = random.Random(3)
+        values = [rng.uniform(-1e6, 1e6) for _ in range(40_000)]
+        src = os.path.join(self.directory.name, "big.bin")
+        with open(src, "wb") as source:
+            array("d", values).tofile(source)
+        memory_limit = 256 * 1024
+        for name, run in (
+            ("sort_file", lambda: sort_file(src, src + ".out", memory_limit=memory_limit,
+                                            tmpdir=self.directory.name)),
+            ("sort_stream", lambda: collections.deque(sort_stream(iter(values), memory_limit=memory_limit,
+                                                                  tmpdir=self.directory.name), maxlen=0)),
+        ):
+            with self.subTest(name):
+                tracemalloc.start()
+                try:
+                    run()
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                self.assertLess(peak, memory_limit)
+
+    def test_single_run_across_filesystems(self):
+        """Единственная серия переносится в dst, даже если rename между файловыми системами невозможен"""
+        src = os.path.join(self.directory.name, "prices.bin")
+        dst = os.path.join(self.directory.name, "sorted.bin")
+        with open(src, "wb") as source:
+            array("d", self.values).tofile(source)
+        with mock.patch("os.rename", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            self.assertEqual(sort_file(src, dst), len(self.values))
+        result = array("d")
+        with open(dst, "rb") as output:
+            result.frombytes(output.read())
+        self.assertEqual(result.tolist(), sorted(self.values))
+
+    def test_invalid_input(self):
+        """Нечисловые значения, неизвестный тип и обрезанный файл отклоняются"""
+        with self.assertRaises(ValueError):
+            list(sort_stream([1, 2, 'three', 4]))
+        with self.assertRaises(ValueError):
+            list(sort_stream([1.5], dtype="q"))
+        with self.assertRaises(ValueError):
+            list(sort_stream([1], dtype="u"))
+        src = os.path.join(self.directory.name, "broken.bin")
+        with open(src, "wb") as source:
+            source.write(b"12345")
+        with self.assertRaises(ValueError):
+            sort_file(src, src + ".out")
+
+
+class TestParallelSort(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.floats = [rng.uniform(-1e3, 1e3) for _ in range(4000)]
+        self.ints = [rng.randint(-10**9, 10**9) for _ in range(4000)]
+
+    def test_parallel_matches_serial(self):
+        """Параллельная сортировка через общую память совпадает с обычной"""
+        with mock.patch.object(gnome_sort, "PARALLEL_THRESHOLD", 1000):
+            for data in (self.floats, self.ints):
+                result = sort(list(data), parallel=True, workers=3)
+                self.assertEqual(result, sorted(data))
+                self.assertEqual({type(x) for x in result}, {type(data[0])})
+
+    def test_disjoint_ranges(self):
+        """Повторы, знаковые нули и пустые диапазоны разделителей не теряют и не переставляют значения"""
+        with mock.patch.object(gnome_sort, "PARALLEL_THRESHOLD", 10):
+            for data in ([5] * 100, [0.0, -0.0] * 50, [3, 1, 2] * 7, list(range(50, 0, -1))):
+                with self.subTest(data=data[:3]):
+                    result = sort(list(data), parallel=True, workers=4)
+                    self.assertEqual(list(map(repr, result)), list(map(repr, sorted(data))))
+
+    def test_small_input_stays_serial(self):
+        """Ниже порога процессы не запускаются"""
+        with mock.patch.object(gnome_sort, "_parallel_sort") as parallel_sort:
+            self.assertEqual(sort(list(self.floats), parallel=True, workers=4), sorted(self.floats))
+        parallel_sort.assert_not_called()
+
+    def test_mixed_input_falls_back(self):
+        """Смешанные int и float сортируются в одном процессе"""
+        data = [1, 1.0] * 1000
+        with mock.patch.object(gnome_sort, "PARALLEL_THRESHOLD", 1000):
+            result = sort(list(data), parallel=True, workers=2)
+        self.assertEqual([type(x) for x in result], [type(x) for x in sorted(data)])
+
+    def test_invalid_workers(self):
+        """Число процессов должно быть положительным целым"""
+        for workers in (0, -2, 1.5):
+            with self.subTest(workers=workers), self.assertRaises(ValueError):
+                sort([3, 1, 2], workers=workers)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_gnome_counts(self):
+        """У гномьей сортировки каждый обмен — один шаг индекса назад"""
+        stats = SortStats()
+        self.assertEqual(sort([5, 4, 3, 2, 1], algorithm="gnome", stats=stats), [1, 2, 3, 4, 5])
+        self.assertEqual(stats.algorithm, "gnome")
+        self.assertEqual(stats.swaps, 10)
+        self.assertEqual(stats.backsteps, 10)
+        self.assertEqual(stats.moves, 0)
+        self.assertGreater(stats.elapsed, 0)
+
+    def test_adaptive_counts(self):
+        """На отсортированном входе адаптивная сортировка делает n - 1 сравнений за один проход"""
+        stats = SortStats()
+        sort([float(value) for value in range(1000)], stats=stats)
+        self.assertEqual((stats.comparisons, stats.swaps, stats.moves, stats.passes), (999, 0, 0, 1))
+
+    def test_integer_counts(self):
+        """Подсчёт и поразрядная сортировка по ключу тоже считаются, а адаптивная сообщает, кто сортировал"""
+        data = [random.randrange(-50, 50) for _ in range(300)]
+        cases = [("counting", {}, "counting"), ("radix", {}, "radix"), ("adaptive", {}, "counting"),
+                 ("counting", {"key": abs}, "counting"), ("radix", {"key": abs}, "radix"),
+                 ("adaptive", {"key": abs}, "counting"), ("counting", {"collation": "ru"}, "counting")]
+        for algorithm, options, engine in cases:
+            with self.subTest(algorithm=algorithm, options=options):
+                stats, events = SortStats(), []
+                values = list(map(str, data)) if "collation" in options else list(data)
+                expected = sorted(values, key=options.get("key")) if "collation" not in options else sorted(values)
+                result = sort(values, algorithm, stats=stats, on_event=lambda event, _: events.append(event), **options)
+                self.assertEqual(result, expected)
+                self.assertEqual(stats.algorithm, engine)
+                self.assertGreater(stats.passes, 0)
+                self.assertGreater(stats.moves, 0)
+                self.assertGreater(stats.elapsed, 0)
+                self.assertEqual(events.count("done"), 1)
+                self.assertEqual(events[-1], "done")
+
+    def test_results_unchanged(self):
+        """Подсчёт не меняет результат и устойчивость ни одного алгоритма"""
+        data = [random.choice([1, 1.0, 2, 2.0, -3]) for _ in range(200)]
+        for algorithm in gnome_sort.ALGORITHMS:
+            if algorithm in gnome_sort.INTEGER_ALGORITHMS:
+                continue
+            with self.subTest(algorithm=algorithm):
+                result = sort(list(data), algorithm=algorithm, stats=SortStats())
+                self.assertEqual([(x, type(x)) for x in result], [(x, type(x)) for x in sorted(data)])
+
+    def test_on_event(self):
+        """on_event получает события и итоговые счётчики"""
+        events = []
+        sort([3, 1, 2], algorithm="gnome", on_event=lambda event, stats: events.append(event))
+        self.assertEqual(events[0], "pass")
+        self.assertEqual(events[-1], "done")
+        self.assertEqual(events.count("swap"), 2)
+        self.assertEqual(events.count("backstep"), 2)
+
+    def test_buffer_and_accumulation(self):
+        """Счётчики работают для буферов и накапливаются между вызовами"""
+        stats = SortStats()
+        buffer = array("d", [2.0, 1.0])
+        sort(buffer, stats=stats)
+        sort([2, 1], stats=stats)
+        self.assertEqual(buffer.tolist(), [1.0, 2.0])
+        self.assertEqual(stats.comparisons, 2)
+        self.assertEqual(stats.as_dict()["moves"] + stats.as_dict()["swaps"], 4)
+
+    def test_no_instrumentation_by_default(self):
+        """Без stats и on_event обёртки не создаются"""
+        with mock.patch.object(gnome_sort, "_instrumented_sort") as instrumented:
+            sort([3, 1, 2])
+        instrumented.assert_not_called()
+
+
+class TestSortedSequence(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(9)
+        self.values = [rng.randint(0, 100) for _ in range(300)]
+        self.sequence = SortedSequence(self.values, load=8)
+
+    def test_construction_and_iteration(self):
+        """Последовательность упорядочена и поддерживает доступ по индексу"""
+        expected = sorted(self.values)
+        self.assertEqual(list(self.sequence), expected)
+        self.assertEqual(len(self.sequence), len(expected))
+        self.assertEqual([self.sequence[i] for i in range(len(expected))], expected)
+        self.assertEqual(self.sequence[-1], expected[-1])
+        self.assertEqual(self.sequence[10:20], expected[10:20])
+        self.assertEqual(list(reversed(self.sequence)), expected[::-1])
+
+    def test_add_and_remove_keep_order(self):
+        """Вставки и удаления сохраняют порядок без пересортировки"""
+        expected = sorted(self.values)
+        for value in (-5, 50, 50.5, 1000, 0):
+            self.sequence.add(value)
+            expected.append(value)
+        for value in (50, -5, 1000):
+            self.sequence.remove(value)
+            expected.remove(value)
+        expected.sort()
+        self.assertEqual(list(self.sequence), expected)
+        self.assertEqual(self.sequence.pop(0), expected.pop(0))
+        del self.sequence[5]
+        del expected[5]
+        self.assertEqual(list(self.sequence), expected)
+
+    def test_bisect_and_search(self):
+        """bisect, count, index и in совпадают с поиском по отсортированному списку"""
+        expected = sorted(self.values)
+        for value in (-1, 0, 17, 50, 100, 101):
+            with self.subTest(value=value):
+                self.assertEqual(self.sequence.bisect_left(value), bisect.bisect_left(expected, value))
+                self.assertEqual(self.sequence.bisect_right(value), bisect.bisect_right(expected, value))
+                self.assertEqual(self.sequence.count(value), expected.count(value))
+                self.assertEqual(value in self.sequence, value in expected)
+        self.assertEqual(self.sequence.index(expected[42]), expected.index(expected[42]))
+
+    def test_errors(self):
+        """Нечисловые значения и отсутствующие элементы вызывают те же ошибки, что и у списка"""
+        with self.assertRaises(ValueError):
+            self.sequence.add('three')
+        with self.assertRaises(ValueError):
+            SortedSequence([1, 2, 'three', 4])
+        with self.assertRaises(ValueError):
+            self.sequence.remove(12345)
+        with self.assertRaises(IndexError):
+            SortedSequence().pop()
+        self.assertFalse(self.sequence.discard(12345))
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_inputs_are_reproducible(self):
+        """Каждое распределение даёт список нужной длины, одинаковый при том же seed"""
+        for distribution in benchmark.DISTRIBUTIONS:
+            with self.subTest(distribution=distribution):
+                data = benchmark.make_input(distribution, 101, seed=3)
+                self.assertEqual(len(data), 101)
+                self.assertEqual(data, benchmark.make_input(distribution, 101, seed=3))
+
+    def test_run_counts_operations(self):
+        """На отсортированном входе адаптивная сортировка делает n - 1 сравнений и ни одной записи"""
+        rows = benchmark.run([100], ["sorted", "random"], ["adaptive", "gnome"], repeat=1)
+        self.assertEqual(len(rows), 4)
+        sorted_row = rows[0]
+        self.assertEqual((sorted_row["comparisons"], sorted_row["swaps"]), (99, 0))
+
+    def test_compare_detects_regressions(self):
+        """Рост сверх порога считается регрессией, короткие замеры игнорируются"""
+        old = [{"algorithm": "adaptive", "distribution": "random", "size": 10,
+                "seconds": 0.5, "comparisons": 100, "swaps": 10}]
+        new = [dict(old[0], seconds=0.52, comparisons=150)]
+        self.assertEqual(len(benchmark.compare(new, old, threshold=0.1)), 1)
+        self.assertEqual(benchmark.compare(new, old, threshold=0.6), [])
+        tiny = [dict(old[0], seconds=0.0001, comparisons=100)]
+        self.assertEqual(benchmark.compare([dict(tiny[0], seconds=0.0005)], tiny, threshold=0.1), [])
+
+    def test_main_exit_code(self):
+        """Регрессия относительно эталона даёт ненулевой код выхода"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            args = ["--sizes", "50", "--distributions", "random", "--algorithms", "adaptive", "--repeat", "1"]
+            with mock.patch("builtins.print"):
+                self.assertEqual(benchmark.main(args + ["--json", path]), 0)
+                with open(path, encoding="utf-8") as source:
+                    report = json.load(source)
+                report["results"][0]["comparisons"] //= 2
+                with open(path, "w", encoding="utf-8") as output:
+                    json.dump(report, output)
+                self.assertEqual(benchmark.main(args + ["--baseline", path]), 1)
+
 if __name__ == '__main__':
     unittest.main()
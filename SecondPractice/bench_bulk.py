@@ -0,0 +1,51 @@
+"""
+Замер загрузки рецептов: конструкторы против from_rows и Ingredient.bulk.
+
+Рецепты устроены как receipt_from_api_* из task.py: название и список
+строк (название, сырой вес, готовый вес, цена). Печатается время
+загрузки одного рецепта в микросекундах и ускорение.
+
+Запуск: python bench_bulk.py [--sizes N ...] [--number K]
+"""
+import argparse
+import random
+import timeit
+
+from task import ColumnarReceipt, Ingredient, Receipt
+
+
+def make_rows(size, floats, rng):
+    value = rng.uniform if floats else rng.randint
+    return [(f"Ингредиент {i}", value(1, 500), value(1, 500), value(0, 1000)) for i in range(size)]
+
+
+def best(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 100, 1000])
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'строк':>6} {'числа':<6} {'что':<16} {'было, мкс':>10} {'стало, мкс':>11} {'ускорение':>10}")
+    for size in args.sizes:
+        number = max(1, args.number * 1000 // size)
+        for floats in (False, True):
+            rows = make_rows(size, floats, rng)
+            cases = (
+                ("Ingredient.bulk", lambda: [Ingredient(*row) for row in rows], lambda: Ingredient.bulk(rows)),
+                ("Receipt", lambda: Receipt("Рецепт", rows), lambda: Receipt.from_rows("Рецепт", rows)),
+                ("ColumnarReceipt", lambda: ColumnarReceipt("Рецепт", rows),
+                 lambda: ColumnarReceipt.from_rows("Рецепт", rows)),
+            )
+            for label, old, new in cases:
+                before, after = best(old, number), best(new, number)
+                print(f"{size:>6} {'float' if floats else 'int':<6} {label:<16} "
+                      f"{before * 1e6:>10.1f} {after * 1e6:>11.1f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Замер правок большого рецепта: get, remove, replace по индексу названий.
+
+Для сравнения — прежний способ: линейный поиск по списку ingredients
+и удаление из середины списка. Печатается время одной операции в
+микросекундах; у индекса оно не должно расти с размером рецепта.
+
+Запуск: python bench_index.py [--sizes N ...] [--number K]
+"""
+import argparse
+import random
+import timeit
+
+from task import Receipt
+
+
+def linear_get(ingredients, name):
+    return next((ingredient for ingredient in ingredients if ingredient.name == name), None)
+
+
+def linear_remove_add(ingredients, name):
+    # --как прежний remove: поиск позиции перебором и del из середины списка--
+    index = next(i for i, ingredient in enumerate(ingredients) if ingredient.name == name)
+    ingredient = ingredients.pop(index)
+    ingredients.append(ingredient)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'ингредиентов':>12} {'операция':<20} {'индекс, мкс':>12} {'перебор, мкс':>13}")
+    for size in args.sizes:
+        rng = random.Random(1)
+        receipt = Receipt("Рецепт", [(f"Ингредиент {i}", 100, 90, 10) for i in range(size)])
+        names = [f"Ингредиент {rng.randrange(size)}" for _ in range(args.number)]
+        receipt.get(names[0])  # --индекс строится при первом поиске--
+        plain = list(receipt.ingredients)  # --перебор идёт по отдельной копии списка--
+
+        def index_remove_add():
+            for name in names:
+                receipt.remove(name)
+                receipt.add((name, 100, 90, 10))
+
+        def replace():
+            for name in names:
+                receipt.replace(name, (name, 100, 90, 10))
+
+        cases = (
+            ("get", lambda: [receipt.get(name) for name in names],
+             lambda: [linear_get(plain, name) for name in names[:20]], 20),
+            ("remove + add", index_remove_add, lambda: [linear_remove_add(plain, name) for name in names[:20]], 20),
+            ("replace", replace, None, 0),
+        )
+        for label, indexed, linear, linear_number in cases:
+            indexed_time = min(timeit.repeat(indexed, number=1, repeat=3)) / args.number
+            linear_text = "-"
+            if linear is not None:
+                linear_time = min(timeit.repeat(linear, number=1, repeat=3)) / linear_number
+                linear_text = f"{linear_time * 1e6:.2f}"
+            print(f"{size:>12} {label:<20} {indexed_time * 1e6:>12.2f} {linear_text:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Замер потоковой загрузки: скорость и пик памяти stream_receipts.
+
+Во временный файл пишется N рецептов по шесть ингредиентов в формате
+JSON Lines или CSV, затем файл читается дважды: потоком (рецепт
+обрабатывается и отбрасывается) и в один список. Пик памяти меряется
+tracemalloc в отдельном прогоне.
+
+Запуск: python bench_loader.py [--receipts N] [--format jsonl|csv]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from loader import CSV_FIELDS, stream_receipts
+
+
+def write_dump(path, count, format):
+    rng = random.Random(1)
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        writer = csv.writer(output)
+        if format == "csv":
+            writer.writerow(CSV_FIELDS)
+        for i in range(count):
+            rows = [(f"Ингредиент {j}", rng.randint(1, 500), rng.randint(1, 500), rng.randint(0, 1000))
+                    for j in range(6)]
+            if format == "csv":
+                writer.writerows((f"Рецепт {i}", *row) for row in rows)
+            else:
+                output.write(json.dumps({"title": f"Рецепт {i}", "ingredients_list": rows}, ensure_ascii=False))
+                output.write("\n")
+
+
+def measure(consume):
+    # время и память — отдельными прогонами: tracemalloc замедляет загрузку в разы
+    start = time.perf_counter()
+    consume()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    consume()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=50_000)
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"dump.{args.format}")
+        write_dump(path, args.receipts, args.format)
+        print(f"файл: {os.path.getsize(path) / 2 ** 20:.1f} МиБ, рецептов: {args.receipts}")
+        cases = (
+            ("поток", lambda: sum(receipt.calc_cost() for receipt in stream_receipts(path))),
+            ("список", lambda: len(list(stream_receipts(path)))),
+        )
+        for label, consume in cases:
+            elapsed, peak = measure(consume)
+            print(f"{label:<7} {elapsed:>7.2f} с  {args.receipts / elapsed:>9.0f} рецептов/с  "
+                  f"пик {peak / 2 ** 20:>7.1f} МиБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Замер памяти на один объект Ingredient и Receipt через tracemalloc.
+
+Сравнивается текущая раскладка на __slots__ с прежней, где атрибуты
+хранились в __dict__ каждого экземпляра. Названия и числа берутся из
+небольшого общего набора, поэтому в замер попадает только сам объект.
+
+Отдельно меряется каталог, где названия повторяются из рецепта в рецепт,
+а строки названий каждый раз новые, как после разбора выгрузки: обычный
+Receipt против IngredientRegistry (общие названия и общие FrozenIngredient).
+
+Запуск: python bench_memory.py [--count N] [--per-receipt K]
+
+Рецептов создаётся count / per-receipt.
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from task import Ingredient, IngredientRegistry, Receipt
+
+
+class DictIngredient:
+    # --прежняя раскладка Ingredient: те же поля, но в __dict__ экземпляра--
+    def __init__(self, name, raw_weight, cooked_weight, cost):
+        self._name = name
+        self._raw_weight = raw_weight
+        self._cooked_weight = cooked_weight
+        self._cost = cost
+
+
+class DictReceipt:
+    # --прежняя раскладка Receipt--
+    def __init__(self, name, ingredients):
+        self._name = name
+        self._ingredients = ingredients
+
+
+ROWS = [("Мука", 100, 100, 90), ("Сахар", 80, 80, 40.5), ("Яйца", 2, 2, 50), ("Творог", 250, 230, 180)]
+CATALOG_NAMES = 200  # --различных названий в каталоге--
+CATALOG_VARIANTS = 5  # --различных количеств одного ингредиента--
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--per-receipt", type=int, default=10)
+    args = parser.parse_args()
+
+    receipts = args.count // args.per_receipt
+    cases = {
+        "Ingredient, __dict__": lambda n: [DictIngredient(*ROWS[i % 4]) for i in range(n)],
+        "Ingredient, __slots__": lambda n: [Ingredient(*ROWS[i % 4]) for i in range(n)],
+    }
+    print(f"{'класс':<24} {'объектов':>10} {'байт на объект':>15}")
+    for label, build in cases.items():
+        print(f"{label:<24} {args.count:>10} {measure(build, args.count):>15.1f}")
+
+    # --рецепт с одним ингредиентом минус сам ингредиент в списке: остаётся только объект рецепта--
+    receipt_cases = {
+        "Receipt, __dict__": (lambda n: [DictReceipt("Рецепт", [DictIngredient(*ROWS[0])]) for _ in range(n)],
+                              lambda n: [[DictIngredient(*ROWS[0])] for _ in range(n)]),
+        "Receipt, __slots__": (lambda n: [Receipt("Рецепт", ROWS[:1]) for _ in range(n)],
+                               lambda n: [[Ingredient(*ROWS[0])] for _ in range(n)]),
+    }
+    for label, (build, parts) in receipt_cases.items():
+        per_object = measure(build, receipts) - measure(parts, receipts)
+        print(f"{label:<24} {receipts:>10} {per_object:>15.1f}")
+
+    print()
+    print(f"{'каталог':<24} {'рецептов':>10} {'МиБ':>10} {'сэкономлено, МиБ':>17}")
+    for label, make in (("Receipt", None), ("реестр, названия", False), ("реестр, share=True", True)):
+        registry = None if make is None else IngredientRegistry(share=make)
+        total = measure(lambda n: build_catalog(n, args.per_receipt, registry), receipts) * receipts
+        saved = "-" if registry is None else f"{registry.saved_bytes / 2 ** 20:.1f}"
+        print(f"{label:<24} {receipts:>10} {total / 2 ** 20:>10.1f} {saved:>17}")
+
+
+def catalog_rows(count, per_receipt):
+    # --строки рецептов из общего словаря; каждое название — новый объект str--
+    rng = random.Random(1)
+    pool = [(f"Ингредиент {i}", 10 * (j + 1), 9 * (j + 1), 0.5 + i + j)
+            for i in range(CATALOG_NAMES) for j in range(CATALOG_VARIANTS)]
+    for _ in range(count):
+        yield [(name.encode().decode(), *numbers) for name, *numbers in rng.sample(pool, per_receipt)]
+
+
+def build_catalog(count, per_receipt, registry):
+    if registry is None:
+        return [Receipt("Рецепт", rows) for rows in catalog_rows(count, per_receipt)]
+    return [registry.receipt("Рецепт", rows) for rows in catalog_rows(count, per_receipt)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Замер планировщика порций: циклы calc_* против plan_portions.
+
+N рецептов по шесть ингредиентов, M вариантов числа порций. Для каждого
+рецепта и числа порций нужны стоимость, сырой и готовый вес. Печатается
+время в секундах.
+
+Запуск: python bench_plan.py [--receipts N] [--portions M]
+"""
+import argparse
+import random
+import time
+
+from task import Receipt, numpy, plan_portions
+
+
+def loops(receipts, portions):
+    return (
+        [[receipt.calc_cost(p) for p in portions] for receipt in receipts],
+        [[receipt.calc_weight(p) for p in portions] for receipt in receipts],
+        [[receipt.calc_weight(p, raw=False) for p in portions] for receipt in receipts],
+    )
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=50_000)
+    parser.add_argument("--portions", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    receipts = [
+        Receipt.from_rows(f"Рецепт {i}", [(f"Ингредиент {j}", rng.randint(1, 500), rng.randint(1, 500),
+                                            rng.randint(0, 1000)) for j in range(6)])
+        for i in range(args.receipts)
+    ]
+    portions = list(range(1, args.portions + 1))
+
+    print(f"NumPy: {'да' if numpy is not None else 'нет'}")
+    print(f"циклы calc_*:  {min(timed(loops, receipts, portions) for _ in range(3)):.3f} с")
+    print(f"plan_portions: {min(timed(plan_portions, receipts, portions) for _ in range(3)):.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Замер запуска из снимка: load_receipts против разбора JSON Lines.
+
+Каталог из N рецептов по шесть ингредиентов сохраняется в JSON Lines и в
+двоичный снимок. Затем меряется время до первого рецепта и время до
+последнего, если пройти весь каталог, для обоих способов.
+
+Запуск: python bench_snapshot.py [--receipts N]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from loader import stream_receipts
+from snapshot import load_receipts, save_receipts
+from task import Receipt
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    catalog = [
+        (f"Рецепт {i}", [(f"Ингредиент {j}", rng.randint(1, 500), rng.randint(1, 500), rng.randint(0, 1000))
+                         for j in range(6)])
+        for i in range(args.receipts)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl = os.path.join(directory, "catalog.jsonl")
+        binary = os.path.join(directory, "catalog.bin")
+        with open(jsonl, "w", encoding="utf-8") as output:
+            for title, rows in catalog:
+                output.write(json.dumps({"title": title, "ingredients_list": rows}, ensure_ascii=False) + "\n")
+        save_seconds = timed(lambda: save_receipts(binary, (Receipt.from_rows(*item) for item in catalog)))
+        print(f"JSON Lines: {os.path.getsize(jsonl) / 2 ** 20:.1f} МиБ, "
+              f"снимок: {os.path.getsize(binary) / 2 ** 20:.1f} МиБ (запись {save_seconds:.2f} с)")
+
+        def first_snapshot():
+            with load_receipts(binary) as snapshot:
+                snapshot[0]
+
+        def all_snapshot():
+            with load_receipts(binary) as snapshot:
+                for receipt in snapshot:
+                    pass
+
+        cases = (
+            ("JSON Lines, первый рецепт", lambda: next(stream_receipts(jsonl))),
+            ("JSON Lines, весь каталог", lambda: list(stream_receipts(jsonl))),
+            ("снимок, первый рецепт", first_snapshot),
+            ("снимок, весь каталог", all_snapshot),
+        )
+        for label, function in cases:
+            print(f"{label:<26} {min(timed(function) for _ in range(3)) * 1000:>10.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
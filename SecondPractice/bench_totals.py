@@ -0,0 +1,35 @@
+"""
+Замер calc_cost и calc_weight для Receipt и ColumnarReceipt.
+
+Один "запрос" — calc_cost() и calc_weight() для сырого и готового веса,
+как в карточке рецепта. Печатается время запроса в микросекундах.
+
+Запуск: python bench_totals.py [--sizes N ...] [--number K]
+"""
+import argparse
+import timeit
+
+from task import ColumnarReceipt, Receipt
+
+
+def request(receipt):
+    return receipt.calc_cost(), receipt.calc_weight(), receipt.calc_weight(raw=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 100, 10_000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'ингредиентов':>12} {'класс':<16} {'мкс на запрос':>14}")
+    for size in args.sizes:
+        rows = [(f"Ингредиент {i}", 100 + i % 7, 90 + i % 5, 10 + i % 50) for i in range(size)]
+        for cls in (Receipt, ColumnarReceipt):
+            receipt = cls("Рецепт", rows)
+            elapsed = min(timeit.repeat(lambda: request(receipt), number=args.number, repeat=5)) / args.number
+            print(f"{size:>12} {cls.__name__:<16} {elapsed * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Потоковая загрузка рецептов из выгрузок JSON Lines и CSV.
+
+Рецепты читаются по одному, в памяти держится только текущий. Строка
+с ошибкой не прерывает поток: ошибка с номером строки передаётся в
+on_error, а чтение продолжается со следующего рецепта.
+
+JSON Lines — по объекту на строку, как receipt_from_api_* в task.py:
+    {"title": "Парфе", "ingredients_list": [["Йогурт", 200, 180, 50], ...]}
+
+CSV — заголовок title,name,raw_weight,cooked_weight,cost и по строке
+на ингредиент; идущие подряд строки с одним title образуют один рецепт.
+"""
+import csv
+import json
+import logging
+import os
+from itertools import groupby
+
+from task import Receipt
+
+CSV_FIELDS = ("title", "name", "raw_weight", "cooked_weight", "cost")
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+logger = logging.getLogger(__name__)
+
+
+class LoadError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+def stream_receipts(path, format=None, receipt_class=Receipt, as_tuples=False, on_error=None, registry=None):
+    # Генератор рецептов из файла path. as_tuples=True выдаёт (title, rows)
+    # без создания объектов: проверяется только структура записи.
+    # С registry (IngredientRegistry) рецепты собираются через него
+    if format is None:
+        format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in ("jsonl", "csv"):
+        raise ValueError("Unknown dump format, expected 'jsonl' or 'csv'.")
+    if on_error is None:
+        on_error = _log_error
+    records = _jsonl_records(path) if format == "jsonl" else _csv_records(path)
+    for line, record in records:
+        if isinstance(record, Exception):
+            on_error(LoadError(line, str(record)))
+            continue
+        if as_tuples:
+            yield record
+            continue
+        try:
+            if registry is not None:
+                receipt = registry.receipt(*record, receipt_class=receipt_class)
+            else:
+                receipt = receipt_class.from_rows(*record)
+        except (ValueError, TypeError) as error:
+            on_error(LoadError(line, str(error)))
+            continue
+        yield receipt
+
+
+def _log_error(error):
+    logger.warning("%s", error)
+
+
+def _jsonl_records(path):
+    # (номер строки, (title, rows)) или (номер строки, исключение разбора);
+    # строки декодирует json.loads, поэтому битый UTF-8 — ошибка одной строки
+    with open(path, "rb") as source:
+        for line, text in enumerate(source, 1):
+            if not text.strip():
+                continue
+            try:
+                data = json.loads(text)
+                if not isinstance(data, dict):
+                    raise ValueError("Record must be a JSON object.")
+                if "title" not in data or "ingredients_list" not in data:
+                    raise ValueError("Record must have 'title' and 'ingredients_list'.")
+                rows = data["ingredients_list"]
+                if not isinstance(rows, list):
+                    raise ValueError("Ingredients must be a list.")
+                yield line, (data["title"], [tuple(row) if isinstance(row, list) else row for row in rows])
+            except ValueError as error:
+                yield line, error
+
+
+def _csv_records(path):
+    # surrogateescape: битые байты UTF-8 становятся суррогатами, и ошибкой
+    # считается только рецепт со строкой, где они встретились, а не весь файл
+    with open(path, encoding="utf-8-sig", errors="surrogateescape", newline="") as source:
+        rows = _csv_rows(csv.reader(source))
+        line, _, header = next(rows, (None, None, None))
+        if header is None:
+            return
+        if isinstance(header, Exception) or tuple(field.strip() for field in header) != CSV_FIELDS:
+            yield line, ValueError(f"CSV header must be {','.join(CSV_FIELDS)}.")
+            return
+        # строки одного рецепта идут подряд; номер строки — первая строка рецепта
+        for title, group in groupby(rows, key=lambda item: item[1]):
+            line, records, error = None, [], None
+            for row_line, _, row in group:
+                if line is None:
+                    line = row_line
+                if error is not None:
+                    continue
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    if len(row) != len(CSV_FIELDS):
+                        raise ValueError(f"Expected {len(CSV_FIELDS)} fields, got {len(row)}.")
+                    _check_text(row)
+                    records.append((row[1], *map(_number, row[2:])))
+                except (ValueError, csv.Error) as parse_error:
+                    line, error = row_line, parse_error
+            yield line, (title, records) if error is None else error
+
+
+def _csv_rows(reader):
+    # (номер строки, title, поля) для непустых строк. Строка, которую не
+    # разобрал csv, идёт вместо полей исключением с title предыдущей строки:
+    # она портит только текущий рецепт, а чтение продолжается
+    title = None
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield reader.line_num, title, error
+            continue
+        if row:
+            title = row[0]
+            yield reader.line_num, title, row
+
+
+def _check_text(row):
+    for field in row:
+        if not field.isascii():
+            try:
+                field.encode("utf-8")
+            except UnicodeEncodeError:
+                raise ValueError("Invalid UTF-8 byte sequence.") from None
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Could not parse number {text!r}.") from None
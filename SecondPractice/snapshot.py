@@ -0,0 +1,209 @@
+"""
+Двоичный снимок набора рецептов и его ленивая загрузка через mmap.
+
+Формат, все числа little-endian:
+    заголовок         MAGIC, версия, флаги (пока 0), число рецептов R, число
+                      ингредиентов I, число различных строк S, длина блока строк в байтах
+    uint64[R + 1]     номер первого ингредиента каждого рецепта
+    uint64[R]         номера строк названий рецептов
+    uint64[I]         номера строк названий ингредиентов
+    3 x 8-байт[I]     сырой вес, готовый вес, стоимость; что лежит в ячейке,
+                      говорит её байт типа
+    uint64[S + 1]     смещения строк в блоке строк
+    3 x uint8[I]      типы значений: 0 — float64, 1 — int64, 2 — целое вне
+                      int64, в ячейке номер строки с его hex-записью
+    байты             различные строки UTF-8 подряд; повторяющиеся названия
+                      хранятся один раз
+
+Рецепты собираются при первом обращении и без повторной проверки:
+данные проверены при создании рецептов до записи.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+
+from task import Receipt
+
+MAGIC = b"RCPT"
+VERSION = 2
+HEADER = struct.Struct("<4sHHQQQQ")
+NUMBER_FIELDS = ("raw_weight", "cooked_weight", "cost")
+FLOAT, INT, BIG_INT = 0, 1, 2  # байты типов значений
+
+
+def save_receipts(path, receipts):
+    # Запись во временный файл и os.replace: недописанный снимок не заменит старый
+    string_ids = {}
+    names, ingredient_names = array("Q"), array("Q")
+    columns = ([], [], [])
+    starts = array("Q", [0])
+    for receipt in receipts:
+        names.append(string_ids.setdefault(receipt.name, len(string_ids)))
+        for ingredient in receipt.ingredients:
+            ingredient_names.append(string_ids.setdefault(ingredient.name, len(string_ids)))
+            for column, field in zip(columns, NUMBER_FIELDS):
+                column.append(getattr(ingredient, field))
+        starts.append(len(ingredient_names))
+
+    numbers, kinds = zip(*(_number_column(column, string_ids) for column in columns))
+    strings = [name.encode("utf-8", "surrogatepass") for name in string_ids]
+    offsets = array("Q", accumulate(map(len, strings), initial=0))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as output:
+        output.write(HEADER.pack(MAGIC, VERSION, 0, len(names), len(ingredient_names),
+                                 len(strings), offsets[-1]))
+        for section in (starts, names, ingredient_names, *numbers, offsets):
+            if sys.byteorder != "little":
+                section.byteswap()
+            section.tofile(output)
+        for section in kinds:
+            output.write(section)
+        output.write(b"".join(strings))
+    os.replace(temporary, path)
+    return len(names)
+
+
+def load_receipts(path, receipt_class=Receipt, validate=False):
+    return ReceiptSnapshot(path, receipt_class, validate)
+
+
+def _number_column(values, string_ids):
+    # Ячейки столбца и байты их типов: тип хранится для каждого значения,
+    # поэтому один float в каталоге не превращает соседние целые в float
+    kinds = bytes(map(_kind, values))
+    if kinds.count(INT) == len(kinds):
+        return array("q", values), kinds
+    if kinds.count(FLOAT) == len(kinds):
+        return array("d", values), kinds
+    cells = array("q")
+    cells.frombytes(array("d", [value if kind == FLOAT else 0.0 for value, kind in zip(values, kinds)]).tobytes())
+    for position, (value, kind) in enumerate(zip(values, kinds)):
+        if kind == INT:
+            cells[position] = value
+        elif kind == BIG_INT:  # hex: у десятичной записи длинных целых есть предел длины
+            cells[position] = string_ids.setdefault(hex(value), len(string_ids))
+    return cells, kinds
+
+
+def _kind(value):
+    if not isinstance(value, int):
+        return FLOAT
+    return INT if -(1 << 63) <= value < 1 << 63 else BIG_INT
+
+
+class ReceiptSnapshot(Sequence):
+    # Последовательность рецептов поверх mmap снимка. Рецепт собирается при
+    # первом обращении и запоминается, поэтому изменения в нём не теряются.
+    # validate=True собирает рецепты через from_rows, с полной проверкой
+
+    def __init__(self, path, receipt_class=Receipt, validate=False):
+        self._receipt_class = receipt_class
+        self._validate = validate
+        self._views = []
+        with open(path, "rb") as source:
+            size = os.fstat(source.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("Snapshot is truncated or corrupted.")
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(size)
+        except ValueError:
+            self.close()
+            raise
+
+    def _open(self, size):
+        magic, version, flags, count, ingredients, strings, text_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError("File is not a receipt snapshot.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}.")
+        if size != HEADER.size + 8 * (2 * count + 4 * ingredients + strings + 2) + 3 * ingredients + text_size:
+            raise ValueError("Snapshot is truncated or corrupted.")
+        self._count = count
+        self._position = HEADER.size
+        self._starts = self._section("Q", count + 1)
+        self._names = self._section("Q", count)
+        self._ingredient_names = self._section("Q", ingredients)
+        self._numbers = []
+        for _ in NUMBER_FIELDS:  # одни и те же байты как int64 и как float64
+            start = self._position
+            ints = self._section("q", ingredients)
+            self._position = start
+            self._numbers.append((ints, self._section("d", ingredients)))
+        self._offsets = self._section("Q", strings + 1)
+        self._kinds = [self._section("B", ingredients, 1) for _ in NUMBER_FIELDS]
+        self._text = self._position
+        self._strings = {}  # номер строки -> str: одинаковые названия становятся одним объектом
+        self._cache = [None] * count
+
+    def _section(self, typecode, length, itemsize=8):
+        start, self._position = self._position, self._position + itemsize * length
+        if sys.byteorder != "little":  # машинный порядок не совпадает с форматом: копия с разворотом
+            section = array(typecode, self._mmap[start:self._position])
+            section.byteswap()
+            return section
+        section = memoryview(self._mmap)[start:self._position].cast(typecode)
+        self._views.append(section)
+        return section
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Receipt index out of range.")
+        receipt = self._cache[index]
+        if receipt is None:
+            receipt = self._cache[index] = self._build(index)
+        return receipt
+
+    def _build(self, index):
+        start, stop = self._starts[index], self._starts[index + 1]
+        names = list(map(self._string, self._ingredient_names[start:stop]))
+        columns = [names, *(self._values(field, start, stop) for field in range(len(NUMBER_FIELDS)))]
+        name = self._string(self._names[index])
+        if self._validate:
+            return self._receipt_class.from_rows(name, zip(*columns))
+        return self._receipt_class._from_columns(name, columns)
+
+    def _values(self, field, start, stop):
+        ints, floats = self._numbers[field]
+        kinds = self._kinds[field][start:stop].tobytes()
+        if kinds.count(INT) == len(kinds):
+            return ints[start:stop].tolist()
+        if kinds.count(FLOAT) == len(kinds):
+            return floats[start:stop].tolist()
+        return [
+            float_value if kind == FLOAT else int_value if kind == INT else int(self._string(int_value), 16)
+            for kind, int_value, float_value in zip(kinds, ints[start:stop].tolist(), floats[start:stop].tolist())
+        ]
+
+    def _string(self, index):
+        string = self._strings.get(index)
+        if string is None:
+            start = self._text + self._offsets[index]
+            stop = self._text + self._offsets[index + 1]
+            string = self._strings[index] = str(self._mmap[start:stop], "utf-8", "surrogatepass")
+        return string
+
+    def close(self):
+        # Уже собранные рецепты остаются доступны: их данные скопированы из mmap
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
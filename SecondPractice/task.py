@@ -1,6 +1,23 @@
+import math
+import sys
+import weakref
+from array import array
+from bisect import insort
+from collections import namedtuple
+from itertools import repeat
+from operator import mul
+
+try:
+    import numpy
+except ImportError:  # NumPy необязателен: без него plan_portions строит матрицы списками
+    numpy = None
+
+
 class Ingredient:
     MAX_COST = 1000
 
+    __slots__ = ("_name", "_raw_weight", "_cooked_weight", "_cost", "_owner")
+
     def __init__(
         self,
         name: str,
@@ -8,6 +25,7 @@ class Ingredient:
         cooked_weight: (int, float),
         cost: (int, float),
     ) -> None:
+        self._owner = None  # рецепты, чьи суммы зависят от этого ингредиента (см. _owners)
         self.name = name
         self.raw_weight = raw_weight
         self.cooked_weight = cooked_weight
@@ -23,6 +41,8 @@ class Ingredient:
             raise TypeError("Name must be a string.")
         if not value.strip():
             raise ValueError("Name cannot be empty.")
+        if self._owner is not None:
+            self._notify("_name", value)
         self._name = value
 
     @property
@@ -35,6 +55,8 @@ class Ingredient:
             raise ValueError("Raw weight must be a number.")
         if value <= 0:
             raise ValueError("Raw weight must be positive.")
+        if self._owner is not None:
+            self._notify("_raw_weight", value)
         self._raw_weight = value
 
     @property
@@ -47,6 +69,8 @@ class Ingredient:
             raise ValueError("Cooked weight must be a number.")
         if value <= 0:
             raise ValueError("Cooked weight must be positive.")
+        if self._owner is not None:
+            self._notify("_cooked_weight", value)
         self._cooked_weight = value
 
     @property
@@ -59,10 +83,121 @@ class Ingredient:
             raise ValueError("Cost must be a number.")
         if value < 0:
             raise ValueError("Cost must be non-negative.")
-        if value > 1000:
+        if value > self.MAX_COST:
             raise ValueError("Cost exceeds the maximum allowed value.")
+        if self._owner is not None:
+            self._notify("_cost", value)
         self._cost = value
 
+    @classmethod
+    def bulk(cls, rows):
+        return cls._from_columns(cls._columns(rows))
+
+    @classmethod
+    def _columns(cls, rows):
+        # Столбцы названий, весов и цен, проверенные целиком встроенными функциями.
+        # Если быстрая проверка не прошла, строки разбираются по одной сеттерами:
+        # так ошибка та же, что у Ingredient(*row) для первой плохой строки
+        rows = list(rows)
+        if not rows:
+            return [], [], [], []
+        try:
+            if set(map(len, rows)) == {4}:
+                columns = list(zip(*rows))
+                if cls._valid_columns(*columns):
+                    return columns
+        except TypeError:  # строка без len() или несравнимые значения
+            pass
+        ingredients = [cls(*row) for row in rows]
+        return [[getattr(ingredient, field) for ingredient in ingredients]
+                for field in ("_name", "_raw_weight", "_cooked_weight", "_cost")]
+
+    @classmethod
+    def _valid_columns(cls, names, raw_weights, cooked_weights, costs):
+        # Подклассы int/float (bool и т.п.) и NaN в min/max дают False
+        # и уходят на медленный путь, который решает так же, как сеттеры
+        return (
+            {*map(type, names)} == {str}
+            and "" not in names
+            and not any(map(str.isspace, names))
+            and {*map(type, raw_weights), *map(type, cooked_weights), *map(type, costs)} <= {int, float}
+            and min(raw_weights) > 0
+            and min(cooked_weights) > 0
+            and min(costs) >= 0
+            and max(costs) <= cls.MAX_COST
+        )
+
+    @classmethod
+    def _from_columns(cls, columns, owner=None):
+        ingredients = []
+        append, new = ingredients.append, cls.__new__
+        for name, raw_weight, cooked_weight, cost in zip(*columns):
+            ingredient = new(cls)
+            ingredient._owner = owner
+            ingredient._name = name
+            ingredient._raw_weight = raw_weight
+            ingredient._cooked_weight = cooked_weight
+            ingredient._cost = cost
+            append(ingredient)
+        return ingredients
+
+    def _notify(self, field, value):
+        owners = self._owners()
+        if field == "_name":  # новое название — новое место в индексе рецепта
+            for owner in owners:
+                owner._rename(self, value)
+            return
+        old = getattr(self, field)
+        for owner in owners:
+            getattr(owner, Receipt._TOTALS[field]).replace(old, value)
+
+    def _owners(self):
+        # _owner — слабая ссылка на единственный рецепт-владелец или WeakKeyDictionary
+        # «рецепт -> сколько раз в нём ингредиент», если рецептов несколько или
+        # ингредиент входит в рецепт дважды. Брошенный рецепт удаляется сборщиком,
+        # не дожидаясь ингредиента, и дальше не уведомляется
+        owner = self._owner
+        if isinstance(owner, weakref.ref):
+            receipt = owner()
+            if receipt is None:
+                self._owner = None
+                return ()
+            return (receipt,)
+        return [receipt for receipt, count in list(owner.items()) for _ in range(count)]
+
+    def _attach(self, receipt):
+        owner = self._owner
+        if isinstance(owner, weakref.ref):
+            current = owner()
+            if current is None:
+                owner = None
+            else:  # один объект в нескольких рецептах или дважды в одном
+                owner = self._owner = weakref.WeakKeyDictionary({current: 1})
+        if owner is None:
+            self._owner = weakref.ref(receipt)
+        else:
+            owner[receipt] = owner.get(receipt, 0) + 1
+
+    def _detach(self, receipt):
+        owner = self._owner
+        if owner is None:
+            return
+        if isinstance(owner, weakref.ref):
+            if owner() is receipt:
+                self._owner = None
+            return
+        count = owner.get(receipt, 0)
+        if count > 1:
+            owner[receipt] = count - 1
+        elif count:
+            del owner[receipt]
+        if len(owner) <= 1:  # снова один владелец или ни одного
+            entries = list(owner.items())
+            if not entries:
+                self._owner = None
+            elif entries[0][1] == 1:
+                self._owner = weakref.ref(entries[0][0])
+
     def __str__(self) -> str:
         return (
             f"---------------------\n"
@@ -74,13 +209,217 @@ class Ingredient:
         )
 
 
+def _exact_partials(values):
+    # Точная сумма float в виде слагаемых: округлённая сумма, затем ошибка
+    # её округления, затем ошибка этой ошибки и т.д. Каждое слагаемое — один
+    # проход math.fsum в C вместо цикла add по каждому значению
+    partials, negated = [], []
+    try:
+        while True:
+            part = math.fsum(values + negated)
+            if not math.isfinite(part):
+                return None
+            if not part:
+                return partials[::-1]
+            partials.append(part)
+            negated.append(-part)
+    except (OverflowError, ValueError):
+        return None
+
+
+class _RunningSum:
+    # Точная сумма, которую можно уменьшать: целые копятся в int, а float —
+    # в частичных суммах без потери младших разрядов (как в math.fsum),
+    # поэтому после любых изменений значение совпадает с пересчётом заново.
+    # inf и nan считаются отдельно: вычитание inf из частичных сумм дало бы nan
+    __slots__ = ("_int", "_partials", "_floats", "_special")
+
+    def __init__(self, values=()):
+        self._int = 0
+        self._partials = None  # список появляется только с первым float
+        self._floats = 0
+        self._special = None  # [+inf, -inf, nan] — появляется с первым таким значением
+        values = list(values)
+        if all(map(isinstance, values, repeat(int))):
+            self._int = sum(values)
+            return
+        floats = [value for value in values if not isinstance(value, int)]
+        partials = _exact_partials(floats)
+        if partials is None:  # inf или nan: складываем по одному, как в add
+            for value in values:
+                self.add(value)
+            return
+        self._int = sum(value for value in values if isinstance(value, int))
+        self._floats = len(floats)
+        self._partials = partials
+
+    def add(self, value, sign=1):
+        if isinstance(value, int):
+            self._int += sign * value
+            return
+        if not math.isfinite(value):
+            if self._special is None:
+                self._special = [0, 0, 0]
+            self._special[2 if value != value else value < 0] += sign
+            return
+        self._floats += sign
+        if not self._floats:  # float больше не осталось: остаток — погрешность, а не значение
+            self._partials = None
+            return
+        if self._partials is None:
+            self._partials = []
+        x, i, partials = sign * value, 0, self._partials
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            high = x + y
+            low = y - (high - x)
+            if low:
+                partials[i] = low
+                i += 1
+            x = high
+        partials[i:] = [x]
+
+    def replace(self, old, new):
+        self.add(old, -1)
+        self.add(new)
+
+    @property
+    def value(self):
+        if self._special is not None and any(self._special):
+            positive, negative, nan = self._special
+            if nan or (positive and negative):
+                return math.nan
+            return math.inf if positive else -math.inf
+        if not self._floats:
+            return self._int
+        return math.fsum([*self._partials, self._int])
+
+
+class _IngredientList(list):
+    # Список, который отдаёт Receipt.ingredients. Перестановки (sort, reverse,
+    # присваивание среза теми же объектами) проходят как у list, а изменения
+    # состава — через рецепт: append как add, item = x как replace, остальное
+    # пересчитывает суммы и владельцев заново. Список, который рецепту уже
+    # не принадлежит, ведёт себя как обычный
+    __slots__ = ("_receipt",)
+
+    def __init__(self, ingredients=(), receipt=None):
+        super().__init__(ingredients)
+        self._receipt = None if receipt is None else weakref.ref(receipt)
+
+    def _live_receipt(self):
+        receipt = None if self._receipt is None else self._receipt()
+        return receipt if receipt is not None and receipt._ingredients is self else None
+
+    def _change(self, method, *args):
+        receipt = self._live_receipt()
+        if receipt is None:
+            return method(self, *args)
+        before = list(self)
+        result = method(self, *args)
+        try:
+            receipt._resync(before)
+        except Exception:  # например, в список попал не ингредиент: возвращаем как было
+            list.__setitem__(self, slice(None), before)
+            raise
+        return result
+
+    def append(self, ingredient):
+        receipt = self._live_receipt()
+        if receipt is None:
+            list.append(self, ingredient)
+        else:
+            receipt.add(ingredient)
+
+    def __setitem__(self, index, value):
+        receipt = self._live_receipt()
+        if receipt is None:
+            list.__setitem__(self, index, value)
+        elif isinstance(index, slice):
+            value = list(value)
+            if sorted(map(id, self[index])) == sorted(map(id, value)):  # перестановка: суммы те же
+                list.__setitem__(self, index, value)
+            else:
+                self._change(list.__setitem__, index, value)
+        elif self[index] is None:  # пропуск после remove в ранее полученной ссылке
+            self._change(list.__setitem__, index, value)
+        elif self[index] is not value:
+            receipt._replace_at(range(len(self))[index], receipt._as_ingredient(value))
+
+    def __delitem__(self, index):
+        self._change(list.__delitem__, index)
+
+    def __iadd__(self, values):
+        self._change(list.extend, list(values))
+        return self
+
+    def __imul__(self, count):
+        self._change(list.__imul__, count)
+        return self
+
+    def extend(self, values):
+        self._change(list.extend, list(values))
+
+    def insert(self, index, ingredient):
+        self._change(list.insert, index, ingredient)
+
+    def pop(self, index=-1):
+        return self._change(list.pop, index)
+
+    def remove(self, ingredient):
+        self._change(list.remove, ingredient)
+
+    def clear(self):
+        self._change(list.clear)
+
+
 class Receipt:
+    __slots__ = (
+        "_name", "_ingredients", "_raw_total", "_cooked_total", "_cost_total",
+        "_index", "_indexed", "_tombstones", "__weakref__",
+    )
+
+    _TOTALS = {"_raw_weight": "_raw_total", "_cooked_weight": "_cooked_total", "_cost": "_cost_total"}
+
     def __init__(
         self, name: str, ingredient_list: list[tuple[str, float, float, float]]
     ):
         self.name = name
         self.ingredients = [Ingredient(*ingredient) for ingredient in ingredient_list]
 
+    @classmethod
+    def from_rows(cls, name: str, rows: list[tuple[str, float, float, float]]):
+        receipt = cls.__new__(cls)
+        Receipt.name.fset(receipt, name)  # у FrozenReceipt свойство name только для чтения
+        receipt._set_columns(Ingredient._columns(rows))
+        return receipt
+
+    @classmethod
+    def _from_ingredients(cls, name, ingredients):
+        receipt = cls.__new__(cls)
+        receipt.name = name
+        receipt.ingredients = ingredients
+        return receipt
+
+    @classmethod
+    def _from_columns(cls, name, columns):
+        # Без проверок: столбцы уже проверены, например при записи снимка
+        receipt = cls.__new__(cls)
+        receipt._name = name
+        receipt._set_columns(columns)
+        return receipt
+
+    def _set_columns(self, columns):
+        # Новые ингредиенты принадлежат только этому рецепту: отвязывать некого
+        if not columns[0]:
+            raise ValueError("Ingredient list cannot be empty.")
+        self._ingredients = _IngredientList(Ingredient._from_columns(columns, owner=weakref.ref(self)), self)
+        self._index, self._tombstones = None, 0
+        self._raw_total = _RunningSum(columns[1])
+        self._cooked_total = _RunningSum(columns[2])
+        self._cost_total = _RunningSum(columns[3])
+
     @property
     def name(self):
         return self._name
@@ -95,10 +434,172 @@ class Receipt:
 
     @property
     def ingredients(self):
+        # Сам список, а не копия: его можно переупорядочить на месте, а изменения
+        # состава _IngredientList передаёт рецепту, так что суммы не расходятся
+        if self._tombstones:
+            self._compact()
         return self._ingredients
 
     @ingredients.setter
     def ingredients(self, value: list[Ingredient]):
+        self._check_ingredients(value)
+        for ingredient in getattr(self, "_ingredients", None) or ():
+            if ingredient is not None:
+                ingredient._detach(self)
+        for ingredient in value:
+            ingredient._attach(self)
+        self._ingredients = _IngredientList(value, self)
+        self._recount()
+
+    def _recount(self):
+        ingredients = self._ingredients
+        self._index, self._tombstones = None, 0
+        self._raw_total = _RunningSum(ingredient._raw_weight for ingredient in ingredients)
+        self._cooked_total = _RunningSum(ingredient._cooked_weight for ingredient in ingredients)
+        self._cost_total = _RunningSum(ingredient._cost for ingredient in ingredients)
+
+    def _resync(self, before):
+        # Состав списка изменился не через add/remove/replace (del, pop, insert...):
+        # before — содержимое до изменения, с пропусками после remove
+        ingredients = self._ingredients
+        if self._tombstones:
+            list.__setitem__(ingredients, slice(None), [ingredient for ingredient in ingredients if ingredient is not None])
+        self._check_ingredients(ingredients)
+        for ingredient in before:
+            if ingredient is not None:
+                ingredient._detach(self)
+        for ingredient in ingredients:
+            ingredient._attach(self)
+        self._recount()
+
+    def _replace_at(self, position, new):
+        # Присваивание элемента списка: место уже известно, но список могли
+        # переставить, поэтому индекс не правится, а строится заново
+        old = self._ingredients[position]
+        list.__setitem__(self._ingredients, position, new)
+        old._detach(self)
+        new._attach(self)
+        self._index = None
+        self._raw_total.replace(old._raw_weight, new._raw_weight)
+        self._cooked_total.replace(old._cooked_weight, new._cooked_weight)
+        self._cost_total.replace(old._cost, new._cost)
+
+    def get(self, name, default=None):
+        positions = self._positions(name)
+        return self._ingredients[positions[0]] if positions else default
+
+    def add(self, ingredient):
+        ingredient = self._as_ingredient(ingredient)
+        ingredient._attach(self)
+        if self._index is not None:
+            self._index.setdefault(ingredient._name, []).append(len(self._ingredients))
+            self._indexed += 1
+        list.append(self._ingredients, ingredient)
+        self._raw_total.add(ingredient._raw_weight)
+        self._cooked_total.add(ingredient._cooked_weight)
+        self._cost_total.add(ingredient._cost)
+
+    def remove(self, ingredient):
+        # ingredient — объект из рецепта или название (удаляется первый с таким названием).
+        # На месте удалённого остаётся None; список сжимается, когда таких мест больше половины.
+        # Все проверки идут до первого изменения: при ошибке рецепт остаётся прежним
+        position = self._position(ingredient)
+        if len(self._ingredients) - self._tombstones == 1:
+            raise ValueError("Ingredient list cannot be empty.")
+        ingredient = self._ingredients[position]
+        self._unindex(ingredient._name, position)
+        list.__setitem__(self._ingredients, position, None)
+        self._tombstones += 1
+        ingredient._detach(self)
+        self._raw_total.add(ingredient._raw_weight, -1)
+        self._cooked_total.add(ingredient._cooked_weight, -1)
+        self._cost_total.add(ingredient._cost, -1)
+        if self._tombstones * 2 > len(self._ingredients):
+            self._compact()
+
+    def replace(self, old, new):
+        # Замена на том же месте; возвращает заменённый ингредиент
+        position = self._position(old)
+        new = self._as_ingredient(new)
+        old = self._ingredients[position]
+        list.__setitem__(self._ingredients, position, new)
+        old._detach(self)
+        new._attach(self)
+        self._unindex(old._name, position)
+        insort(self._index.setdefault(new._name, []), position)
+        self._raw_total.replace(old._raw_weight, new._raw_weight)
+        self._cooked_total.replace(old._cooked_weight, new._cooked_weight)
+        self._cost_total.replace(old._cost, new._cost)
+        return old
+
+    @staticmethod
+    def _as_ingredient(ingredient):
+        if isinstance(ingredient, tuple):
+            ingredient = Ingredient(*ingredient)
+        if not isinstance(ingredient, Ingredient):
+            raise ValueError("All items in the ingredient list must be instances of Ingredient.")
+        return ingredient
+
+    def _name_index(self):
+        # название -> позиции в _ingredients по возрастанию; строится при первом поиске
+        # и заново, если длина списка изменилась в обход add и remove
+        if self._index is None or self._indexed != len(self._ingredients):
+            if self._tombstones:
+                self._compact()
+            index = {}
+            for position, ingredient in enumerate(self._ingredients):
+                index.setdefault(ingredient._name, []).append(position)
+            self._index, self._indexed = index, len(self._ingredients)
+        return self._index
+
+    def _positions(self, name):
+        # ingredients отдаёт живой список, и его могут переставить на месте
+        # (sort по ключу), поэтому позиции сверяются со списком. Если все
+        # позиции названия указывают на ингредиенты с этим названием, других
+        # таких в списке нет, и первая позиция — действительно первая
+        positions = self._name_index().get(name, ())
+        ingredients = self._ingredients
+        for position in positions:
+            ingredient = ingredients[position]
+            if ingredient is None or ingredient._name != name:
+                self._index = None
+                return self._name_index().get(name, ())
+        return positions
+
+    def _position(self, ingredient):
+        if isinstance(ingredient, str):
+            positions = self._positions(ingredient)
+            if positions:
+                return positions[0]
+        elif isinstance(ingredient, Ingredient):
+            for position in self._positions(ingredient._name):
+                if self._ingredients[position] is ingredient:
+                    return position
+        raise ValueError("Ingredient is not in the receipt.")
+
+    def _unindex(self, name, position):
+        positions = self._index[name]
+        positions.remove(position)
+        if not positions:
+            del self._index[name]
+
+    def _rename(self, ingredient, name):
+        if self._index is None:
+            return
+        positions = [position for position in self._positions(ingredient._name)
+                     if self._ingredients[position] is ingredient]
+        for position in positions:  # пусто, если этот рецепт уже обработан: он в _owner дважды
+            self._unindex(ingredient._name, position)
+            insort(self._index.setdefault(name, []), position)
+
+    def _compact(self):
+        # на месте: ссылка на список, полученная через ingredients, остаётся верной
+        ingredients = [ingredient for ingredient in self._ingredients if ingredient is not None]
+        list.__setitem__(self._ingredients, slice(None), ingredients)
+        self._index, self._tombstones = None, 0
+
+    @staticmethod
+    def _check_ingredients(value):
         if not isinstance(value, list):
             raise ValueError("Ingredients must be a list.")
         if not all(isinstance(ingredient, Ingredient) for ingredient in value):
@@ -107,19 +608,12 @@ class Receipt:
             )
         if not value:
             raise ValueError("Ingredient list cannot be empty.")
-        self._ingredients = value
 
     def calc_cost(self, portions=1):
-        total_cost = sum(ingredient.cost for ingredient in self.ingredients)
-        return total_cost * portions
+        return self._cost_total.value * portions
 
     def calc_weight(self, portions=1, raw=True):
-        if raw:
-            total_weight = sum(ingredient.raw_weight for ingredient in self.ingredients)
-        else:
-            total_weight = sum(
-                ingredient.cooked_weight for ingredient in self.ingredients
-            )
+        total_weight = self._raw_total.value if raw else self._cooked_total.value
         return total_weight * portions
 
     def __str__(self) -> str:
@@ -131,6 +625,339 @@ class Receipt:
         )
 
 
+def _column(name):
+    # Свойство, которое читает и пишет ячейку столбца name рецепта-владельца
+    def get(self):
+        return getattr(self._receipt, name)[self._index]
+
+    def set(self, value):
+        self._receipt._store(name, self._index, value)
+
+    return property(get, set)
+
+
+class IngredientView(Ingredient):
+    # Ингредиент ColumnarReceipt без собственных данных: сеттеры Ingredient
+    # проверяют значение и записывают его прямо в столбец рецепта
+    __slots__ = ("_receipt", "_index")
+
+    _name = _column("_names")
+    _raw_weight = _column("_raw_weights")
+    _cooked_weight = _column("_cooked_weights")
+    _cost = _column("_costs")
+
+    def __init__(self, receipt, index: int) -> None:
+        self._owner = None  # суммы ColumnarReceipt считаются по столбцам, уведомлять некого
+        self._receipt = receipt
+        self._index = index
+
+
+class ColumnarReceipt(Receipt):
+    # Тот же рецепт, но по столбцам: названия в списке, числа в array("q"),
+    # если в столбце только целые, или в array("d"), если только float,
+    # поэтому calc_cost и calc_weight — одна сумма по непрерывному буферу.
+    # Смешанный столбец или целые вне int64 хранятся списком, чтобы не терять тип и точность
+    __slots__ = ("_names", "_raw_weights", "_cooked_weights", "_costs")
+
+    @property
+    def ingredients(self):
+        return [IngredientView(self, index) for index in range(len(self._names))]
+
+    @ingredients.setter
+    def ingredients(self, value: list[Ingredient]):
+        self._check_ingredients(value)
+        rows = [
+            (ingredient.name, ingredient.raw_weight, ingredient.cooked_weight, ingredient.cost)
+            for ingredient in value
+        ]
+        names, raw_weights, cooked_weights, costs = zip(*rows)
+        self._names = list(names)
+        self._raw_weights = _number_column(raw_weights)
+        self._cooked_weights = _number_column(cooked_weights)
+        self._costs = _number_column(costs)
+
+    def _set_columns(self, columns):
+        if not columns[0]:
+            raise ValueError("Ingredient list cannot be empty.")
+        names, raw_weights, cooked_weights, costs = columns
+        self._names = list(names)
+        self._raw_weights = _number_column(raw_weights)
+        self._cooked_weights = _number_column(cooked_weights)
+        self._costs = _number_column(costs)
+
+    def _store(self, name, index, value):
+        # Запись в ячейку столбца. Если значение не подходит типу столбца
+        # (float в array("q"), int в array("d"), целое вне int64), столбец
+        # пересобирается через _number_column
+        column = getattr(self, name)
+        if _fits(column, value):
+            try:
+                column[index] = value
+                return
+            except OverflowError:
+                pass
+        values = column.tolist()
+        values[index] = value
+        setattr(self, name, _number_column(values))
+
+    def _append(self, name, value):
+        column = getattr(self, name)
+        if _fits(column, value):
+            try:
+                column.append(value)
+                return
+            except OverflowError:
+                pass
+        setattr(self, name, _number_column([*column.tolist(), value]))
+
+    def get(self, name, default=None):
+        # без индекса: поиск в списке названий идёт в C, столбцы не хранят объектов
+        if name not in self._names:
+            return default
+        return IngredientView(self, self._names.index(name))
+
+    def add(self, ingredient):
+        ingredient = self._as_ingredient(ingredient)
+        self._names.append(ingredient.name)
+        self._append("_raw_weights", ingredient.raw_weight)
+        self._append("_cooked_weights", ingredient.cooked_weight)
+        self._append("_costs", ingredient.cost)
+
+    def remove(self, ingredient):
+        # удалить можно представление этого рецепта или название; представления после него сдвигаются
+        index = self._position(ingredient)
+        if len(self._names) == 1:
+            raise ValueError("Ingredient list cannot be empty.")
+        for column in (self._names, self._raw_weights, self._cooked_weights, self._costs):
+            del column[index]
+
+    def replace(self, old, new):
+        index = self._position(old)
+        new = self._as_ingredient(new)
+        old = Ingredient(self._names[index], self._raw_weights[index], self._cooked_weights[index], self._costs[index])
+        self._names[index] = new.name
+        self._store("_raw_weights", index, new.raw_weight)
+        self._store("_cooked_weights", index, new.cooked_weight)
+        self._store("_costs", index, new.cost)
+        return old
+
+    def _position(self, ingredient):
+        if isinstance(ingredient, str):
+            if ingredient in self._names:
+                return self._names.index(ingredient)
+        elif (isinstance(ingredient, IngredientView) and ingredient._receipt is self
+              and ingredient._index < len(self._names)):
+            return ingredient._index
+        raise ValueError("Ingredient is not in the receipt.")
+
+    def calc_cost(self, portions=1):
+        return _column_sum(self._costs) * portions
+
+    def calc_weight(self, portions=1, raw=True):
+        column = self._raw_weights if raw else self._cooked_weights
+        return _column_sum(column) * portions
+
+
+def _number_column(values):
+    # array("q") для целых, array("d") для float, иначе список
+    values = list(values)
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        try:
+            return array("q", values)
+        except OverflowError:  # целые вне int64 хранятся списком, без потери точности
+            return values
+    if kinds == {float}:
+        return array("d", values)
+    return values
+
+
+def _fits(column, value):
+    # список примет любое число, массив — только значение своего типа
+    if isinstance(column, list):
+        return True
+    return type(value) is (int if column.typecode == "q" else float)
+
+
+def _column_sum(column):
+    # Та же сумма, что у Receipt: целые точно, float через math.fsum, и без
+    # зависимости от NumPy, у которого попарное сложение даёт другое округление
+    if isinstance(column, array):
+        return sum(column) if column.typecode == "q" else math.fsum(column)
+    ints = [value for value in column if isinstance(value, int)]
+    if len(ints) == len(column):
+        return sum(ints)
+    return math.fsum([*(value for value in column if not isinstance(value, int)), sum(ints)])
+
+
+def _read_only(self, value):
+    raise AttributeError(f"{type(self).__name__} is immutable.")
+
+
+class FrozenIngredient(Ingredient):
+    # Ингредиент, который нельзя изменить после создания. Проверки те же,
+    # что у Ingredient. Один объект можно делить между любыми рецептами,
+    # поэтому рецепты его не отслеживают: _owner всегда None.
+    # Сравнивается по значению, хеш считается один раз
+    __slots__ = ("_hash",)
+
+    def __init__(
+        self,
+        name: str,
+        raw_weight: (int, float),
+        cooked_weight: (int, float),
+        cost: (int, float),
+    ) -> None:
+        self._owner = None
+        Ingredient.name.fset(self, name)
+        Ingredient.raw_weight.fset(self, raw_weight)
+        Ingredient.cooked_weight.fset(self, cooked_weight)
+        Ingredient.cost.fset(self, cost)
+
+    name = property(Ingredient.name.fget, _read_only)
+    raw_weight = property(Ingredient.raw_weight.fget, _read_only)
+    cooked_weight = property(Ingredient.cooked_weight.fget, _read_only)
+    cost = property(Ingredient.cost.fget, _read_only)
+
+    def _attach(self, receipt):
+        pass
+
+    def _detach(self, receipt):
+        pass
+
+    def _key(self):
+        return self._name, self._raw_weight, self._cooked_weight, self._cost
+
+    def __hash__(self):
+        value = getattr(self, "_hash", None)  # слот не заполнен, пока хеш не нужен
+        if value is None:
+            value = self._hash = hash(self._key())
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenIngredient):
+            return NotImplemented
+        return self is other or (hash(self) == hash(other) and self._key() == other._key())
+
+
+class FrozenReceipt(Receipt):
+    # Неизменяемый рецепт из FrozenIngredient: годится как ключ словаря,
+    # элемент множества и аргумент functools.lru_cache. Суммы считаются
+    # один раз при создании, хеш — при первом обращении
+    __slots__ = ("_hash",)
+
+    def __init__(
+        self, name: str, ingredient_list: list[tuple[str, float, float, float]]
+    ):
+        Receipt.name.fset(self, name)
+        self._freeze([_frozen(ingredient) for ingredient in ingredient_list])
+
+    @classmethod
+    def _from_ingredients(cls, name, ingredients):
+        return cls(name, ingredients)
+
+    def _set_columns(self, columns):
+        if not columns[0]:
+            raise ValueError("Ingredient list cannot be empty.")
+        self._freeze(FrozenIngredient._from_columns(columns))
+
+    def _freeze(self, ingredients):
+        self._check_ingredients(ingredients)
+        self._ingredients = tuple(ingredients)
+        self._index, self._tombstones = None, 0
+        self._raw_total = _RunningSum(ingredient._raw_weight for ingredient in ingredients)
+        self._cooked_total = _RunningSum(ingredient._cooked_weight for ingredient in ingredients)
+        self._cost_total = _RunningSum(ingredient._cost for ingredient in ingredients)
+
+    name = property(Receipt.name.fget, _read_only)
+    ingredients = property(Receipt.ingredients.fget, _read_only)
+    add = remove = replace = _read_only
+
+    def __hash__(self):
+        value = getattr(self, "_hash", None)
+        if value is None:
+            value = self._hash = hash((self._name, self._ingredients))
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenReceipt):
+            return NotImplemented
+        return self is other or (
+            hash(self) == hash(other) and self._name == other._name and self._ingredients == other._ingredients
+        )
+
+
+def _frozen(ingredient):
+    # Кортеж как в конструкторе Receipt, Ingredient (копируется) или готовый FrozenIngredient
+    if isinstance(ingredient, FrozenIngredient):
+        return ingredient
+    if isinstance(ingredient, Ingredient):
+        return FrozenIngredient(ingredient.name, ingredient.raw_weight, ingredient.cooked_weight, ingredient.cost)
+    return FrozenIngredient(*ingredient)
+
+
+class IngredientRegistry:
+    # Общий экземпляр каждого названия, а при share=True — и общий
+    # FrozenIngredient для одинаковых строк (name, raw_weight, cooked_weight, cost).
+    # saved_bytes — оценка по sys.getsizeof: сколько заняли бы копии строк
+    # и объектов, вместо которых рецепты получили общие
+
+    def __init__(self, share=False):
+        self.share = share
+        self.saved_bytes = 0
+        self._names = {}
+        self._ingredients = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name):
+        if type(name) is not str:  # неверный тип сообщит сеттер Ingredient
+            return name
+        interned = self._names.setdefault(name, name)
+        if interned is not name:
+            self.saved_bytes += sys.getsizeof(name)
+        return interned
+
+    def ingredient(self, name, raw_weight, cooked_weight, cost):
+        name = self.intern(name)
+        if not self.share:
+            return Ingredient(name, raw_weight, cooked_weight, cost)
+        # типы в ключе: иначе 1, 1.0 и True дали бы один и тот же объект
+        key = (name, raw_weight, type(raw_weight), cooked_weight, type(cooked_weight), cost, type(cost))
+        try:
+            ingredient = self._ingredients.get(key)
+        except TypeError:  # нехешируемое значение: ошибку сообщит конструктор
+            return FrozenIngredient(name, raw_weight, cooked_weight, cost)
+        if ingredient is None:
+            ingredient = self._ingredients[key] = FrozenIngredient(name, raw_weight, cooked_weight, cost)
+        else:
+            self.saved_bytes += sys.getsizeof(ingredient)
+        return ingredient
+
+    def receipt(self, name, rows, receipt_class=Receipt):
+        return receipt_class._from_ingredients(name, [self.ingredient(*row) for row in rows])
+
+
+PortionPlan = namedtuple("PortionPlan", ["cost", "raw_weight", "cooked_weight"])
+
+
+def plan_portions(receipts, portions):
+    # Матрицы N x M: строка — рецепт, столбец — число порций. Суммы рецептов
+    # берутся один раз, затем одно внешнее произведение на каждую матрицу
+    receipts, portions = list(receipts), list(portions)
+    totals = (
+        [receipt.calc_cost() for receipt in receipts],
+        [receipt.calc_weight() for receipt in receipts],
+        [receipt.calc_weight(raw=False) for receipt in receipts],
+    )
+    if numpy is not None:
+        portions = numpy.asarray(portions, dtype=numpy.float64)
+        return PortionPlan(*(numpy.multiply.outer(numpy.asarray(column, dtype=numpy.float64), portions)
+                             for column in totals))
+    return PortionPlan(*([list(map(mul, repeat(total), portions)) for total in column] for column in totals))
+
+
 if __name__ == "__main__":
     # По фамилии:
     # (П)етраков-> (П)арфе - Входные аргументы для второй практической работы
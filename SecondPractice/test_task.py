@@ -1,5 +1,18 @@
+import csv
+import functools
+import json
+import math
+import os
+import random
+import sys
+import tempfile
 import unittest
-from task import Ingredient, Receipt
+from array import array
+
+from loader import LoadError, stream_receipts
+from snapshot import ReceiptSnapshot, load_receipts, save_receipts
+from task import (ColumnarReceipt, FrozenIngredient, FrozenReceipt, Ingredient, IngredientRegistry, Receipt,
+                  numpy, plan_portions)
 
 class TestIngredient(unittest.TestCase):
     
@@ -81,8 +94,17 @@ class TestIngredient(unittest.TestCase):
         with self.assertRaises(ValueError):
             Ingredient("", 80, 70, 20)
 
+    def test_slots_layout(self):
+        self.assertFalse(hasattr(self.ingredient, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.ingredient.color = "белый"
+        with self.assertRaises(ValueError):
+            self.ingredient.cost = Ingredient.MAX_COST + 1
+        self.assertEqual(self.ingredient.cost, 20)
+
 
 class TestReceiptSurname(unittest.TestCase):
+    receipt_class = Receipt
 
     @classmethod
     def setUpClass(cls):
@@ -98,7 +120,7 @@ class TestReceiptSurname(unittest.TestCase):
         }
     
     def setUp(self):
-        self.receipt_parfait = Receipt(
+        self.receipt_parfait = self.receipt_class(
             self.receipt_from_api_parfait["title"],
             self.receipt_from_api_parfait["ingredients_list"]
         )
@@ -125,19 +147,26 @@ class TestReceiptSurname(unittest.TestCase):
 
     def test_invalid_ingredient_list(self):
         with self.assertRaises(ValueError):
-            Receipt("Парфе", []) 
+            self.receipt_class("Парфе", []) 
     
     def test_invalid_ingredient_list(self):
         with self.assertRaises(ValueError):
-            Receipt("Парфе", [])
+            self.receipt_class("Парфе", [])
         with self.assertRaises(ValueError):
-            Receipt("Парфе", [("Сахар", -100, 90, 50)])
+            self.receipt_class("Парфе", [("Сахар", -100, 90, 50)])
 
     def test_receipt_with_single_ingredient(self):
-        receipt_single = Receipt("Простой рецепт", [("Вода", 100, 100, 0)])
+        receipt_single = self.receipt_class("Простой рецепт", [("Вода", 100, 100, 0)])
         self.assertEqual(receipt_single.calc_cost(), 0)
         self.assertEqual(receipt_single.calc_weight(), 100)
 
+    def test_slots_layout(self):
+        self.assertFalse(hasattr(self.receipt_parfait, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.receipt_parfait.author = "Петраков"
+        with self.assertRaises(ValueError):
+            self.receipt_parfait.ingredients = [("Сахар", 100, 90, 50)]
+
     def test_receipt_as_string(self):
         receipt_str = str(self.receipt_parfait)
         self.assertIn("Парфе с ягодами и сливками.", receipt_str)
@@ -146,6 +175,7 @@ class TestReceiptSurname(unittest.TestCase):
 
 
 class TestReceiptName(unittest.TestCase):
+    receipt_class = Receipt
 
     @classmethod
     def setUpClass(cls):
@@ -163,7 +193,7 @@ class TestReceiptName(unittest.TestCase):
         cls.invalid_ingredient_list = [("Мука", -100, 100, 90)]  
     
     def setUp(self):
-        self.receipt_erundopel = Receipt(
+        self.receipt_erundopel = self.receipt_class(
             self.receipt_from_api_erundopel["title"],
             self.receipt_from_api_erundopel["ingredients_list"]
         )
@@ -182,31 +212,31 @@ class TestReceiptName(unittest.TestCase):
 
     def test_invalid_receipt_name(self):
         with self.assertRaises(ValueError):
-            Receipt("", self.receipt_from_api_erundopel["ingredients_list"])
+            self.receipt_class("", self.receipt_from_api_erundopel["ingredients_list"])
         with self.assertRaises(ValueError):
-            Receipt(123, self.receipt_from_api_erundopel["ingredients_list"])  
+            self.receipt_class(123, self.receipt_from_api_erundopel["ingredients_list"])  
 
     def test_invalid_ingredient_list(self):
         with self.assertRaises(ValueError):
-            Receipt("Невалидный рецепт", [])  
+            self.receipt_class("Невалидный рецепт", [])  
         with self.assertRaises(ValueError):
-            Receipt("Невалидный рецепт", self.invalid_ingredient_list) 
+            self.receipt_class("Невалидный рецепт", self.invalid_ingredient_list) 
 
     def test_invalid_receipt_with_invalid_ingredient(self):
         with self.assertRaises(ValueError):
-            Receipt("Невалидный рецепт", [("Мука", -100, 100, 90)])  
+            self.receipt_class("Невалидный рецепт", [("Мука", -100, 100, 90)])  
 
     def test_receipt_with_duplicate_ingredients(self):
         duplicate_ingredients = [
             ("Творог", 250, 230, 180),
             ("Творог", 250, 230, 180)
         ]
-        receipt = Receipt("Дублирующийся рецепт", duplicate_ingredients)
+        receipt = self.receipt_class("Дублирующийся рецепт", duplicate_ingredients)
         self.assertEqual(len(receipt.ingredients), 2)
 
     def test_empty_ingredient_name(self):
         with self.assertRaises(ValueError):
-            Receipt("Невалидный рецепт", [("", 100, 100, 50)])
+            self.receipt_class("Невалидный рецепт", [("", 100, 100, 50)])
 
     def test_receipt_as_string(self):
         receipt_str = str(self.receipt_erundopel)
@@ -223,16 +253,792 @@ class TestReceiptName(unittest.TestCase):
         self.assertEqual(self.receipt_erundopel.calc_weight(raw=False), 508)  
 
     def test_receipt_with_single_ingredient(self):
-        receipt_single = Receipt("Простой рецепт", [("Вода", 100, 100, 0)])
+        receipt_single = self.receipt_class("Простой рецепт", [("Вода", 100, 100, 0)])
         self.assertEqual(receipt_single.calc_cost(), 0)
         self.assertEqual(receipt_single.calc_weight(), 100)
 
     def test_large_ingredient_list(self):
         large_ingredient_list = [("Ингредиент_" + str(i), 100, 90, 50) for i in range(100)]
-        receipt_large = Receipt("Большой рецепт", large_ingredient_list)
+        receipt_large = self.receipt_class("Большой рецепт", large_ingredient_list)
         self.assertEqual(receipt_large.calc_cost(), 5000) 
         self.assertEqual(receipt_large.calc_weight(), 10000)  
 
 
+class TestColumnarReceiptSurname(TestReceiptSurname):
+    receipt_class = ColumnarReceipt
+
+    def test_columns(self):
+        self.assertIsInstance(self.receipt_parfait._costs, array)
+        self.assertEqual(self.receipt_parfait._names[0], "Йогурт")
+        self.assertEqual(
+            [ingredient.cost for ingredient in self.receipt_parfait.ingredients],
+            [50, 100, 120, 80, 40]
+        )
+
+    def test_view_setters(self):
+        ingredient = self.receipt_parfait.ingredients[2]
+        self.assertIsInstance(ingredient, Ingredient)
+        ingredient.cost = 20
+        ingredient.name = "Малина"
+        self.assertEqual(self.receipt_parfait.calc_cost(), 290)
+        self.assertEqual(self.receipt_parfait.ingredients[2].name, "Малина")
+        with self.assertRaises(ValueError):
+            ingredient.raw_weight = -1
+        with self.assertRaises(TypeError):
+            ingredient.name = 5
+        self.assertEqual(self.receipt_parfait.calc_weight(), 560)
+
+    def test_reassign_ingredients(self):
+        self.receipt_parfait.ingredients = self.receipt_parfait.ingredients[::-1]
+        self.assertEqual(self.receipt_parfait.ingredients[0].name, "Мюсли")
+        self.assertEqual(self.receipt_parfait.calc_cost(), 390)
+
+    def test_get_remove_replace(self):
+        receipt = self.receipt_parfait
+        self.assertEqual(receipt.get("Ягоды").cost, 120)
+        self.assertIsNone(receipt.get("Сахар"))
+        old = receipt.replace("Ягоды", ("Малина", 150, 150, 200))
+        self.assertEqual((old.name, old.cost), ("Ягоды", 120))
+        self.assertEqual(receipt.ingredients[2].name, "Малина")
+        receipt.remove("Мёд")
+        with self.assertRaisesRegex(ValueError, "Ingredient is not in the receipt."):
+            receipt.remove("Мёд")
+        self.assertEqual(receipt.calc_cost(), 390)
+
+    def test_number_types_kept(self):
+        receipt = self.receipt_parfait
+        self.assertIsInstance(receipt.calc_cost(), int)
+        self.assertIn("Raw Weight: 200\n", str(receipt.ingredients[0]))
+        receipt.ingredients[0].cost = 49.5
+        receipt.add(("Сахар", 2 ** 62 + 1, 1, 1))
+        self.assertEqual((receipt.calc_cost(), receipt.calc_weight(raw=False)), (390.5, 531))
+        self.assertEqual(receipt.calc_weight(), 560 + 2 ** 62 + 1)
+        receipt.ingredients[5].raw_weight = 2 ** 70 + 1
+        receipt.replace("Мёд", ("Мёд", 50.25, 50, 80))
+        self.assertEqual([i.raw_weight for i in receipt.ingredients], [200, 100, 150, 50.25, 60, 2 ** 70 + 1])
+        self.assertEqual([type(i.cooked_weight) for i in receipt.ingredients], [int] * 6)
+
+    def test_sums_match_receipt(self):
+        rng = random.Random(17)
+        rows = [("Мука", rng.uniform(0.01, 1e6), rng.choice([1, 0.1, 1e-9]), 0.1) for _ in range(500)]
+        columnar, receipt = ColumnarReceipt("x", rows), Receipt("x", rows)
+        self.assertEqual(columnar.calc_weight(), receipt.calc_weight())
+        self.assertEqual(columnar.calc_weight(raw=False), receipt.calc_weight(raw=False))
+        self.assertEqual(columnar.calc_cost(), receipt.calc_cost())
+
+
+class TestColumnarReceiptName(TestReceiptName):
+    receipt_class = ColumnarReceipt
+
+
+class TestReceiptTotals(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(18)
+        self.receipt = Receipt("Парфе", [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80)])
+
+    def assertNoDrift(self, receipt):
+        ingredients = receipt.ingredients
+        for total, values in ((receipt.calc_cost(), [i.cost for i in ingredients]),
+                              (receipt.calc_weight(), [i.raw_weight for i in ingredients]),
+                              (receipt.calc_weight(raw=False), [i.cooked_weight for i in ingredients])):
+            expected = math.fsum(values)
+            if math.isnan(expected):
+                self.assertTrue(math.isnan(total))
+            else:
+                self.assertEqual(total, expected)
+
+    def random_value(self, special=False):
+        values = [self.rng.randint(1, 900), round(self.rng.uniform(0.01, 900), 2), 0.1, 1e-9]
+        if special:  # веса принимают inf и nan, стоимость — только nan
+            values += [math.inf, math.nan]
+        return self.rng.choice(values)
+
+    def random_cost(self, special=False):
+        value = self.random_value(special)
+        return value if value != math.inf else 0.5
+
+    def test_setters_add_remove(self):
+        for special in (False, True):
+            receipt = Receipt("Парфе", [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80)])
+            for step in range(2000):
+                ingredients = receipt.ingredients
+                action = self.rng.randrange(5)
+                if action == 0:
+                    receipt.add((f"Ингредиент {step}", self.random_value(special), self.random_value(special),
+                                 self.random_cost(special)))
+                elif action == 1 and len(ingredients) > 1:
+                    receipt.remove(self.rng.choice(ingredients))
+                else:
+                    ingredient = self.rng.choice(ingredients)
+                    field = self.rng.choice(["raw_weight", "cooked_weight", "cost"])
+                    value = self.random_cost(special) if field == "cost" else self.random_value(special)
+                    setattr(ingredient, field, value)
+                self.assertNoDrift(receipt)
+
+    def test_non_finite_values(self):
+        receipt = Receipt("x", [("a", math.inf, 1, 1), ("b", 1.0, 1, 1), ("c", 2.5, 1, 1)])
+        self.assertEqual(receipt.calc_weight(), math.inf)
+        receipt.ingredients[0].raw_weight = 3.0
+        self.assertEqual(receipt.calc_weight(), 6.5)
+        receipt.ingredients[1].cost = math.nan
+        self.assertTrue(math.isnan(receipt.calc_cost()))
+        receipt.remove("b")
+        self.assertEqual(receipt.calc_cost(), 2)
+
+    def test_int_totals_stay_int(self):
+        ingredient = self.receipt.ingredients[0]
+        ingredient.cost = 19.99
+        self.assertEqual(self.receipt.calc_cost(), 99.99)
+        ingredient.cost = 20
+        self.assertEqual(self.receipt.calc_cost(), 100)
+        self.assertIsInstance(self.receipt.calc_cost(), int)
+
+    def test_invalid_change_keeps_totals(self):
+        ingredient = self.receipt.ingredients[0]
+        with self.assertRaises(ValueError):
+            ingredient.cost = 5000
+        with self.assertRaises(ValueError):
+            self.receipt.remove(Ingredient("Сахар", 10, 10, 10))
+        self.assertEqual(self.receipt.calc_cost(), 130)
+
+    def test_shared_and_duplicate_ingredients(self):
+        honey = self.receipt.ingredients[1]
+        other = Receipt("Мёд дважды", [("Вода", 100, 100, 0)])
+        other.add(honey)
+        other.add(honey)
+        honey.cost = 100
+        self.assertEqual(self.receipt.calc_cost(), 150)
+        self.assertEqual(other.calc_cost(), 200)
+        other.remove(honey)
+        honey.cost = 10
+        self.assertEqual(other.calc_cost(), 10)
+        self.assertNoDrift(self.receipt)
+
+    def test_reassigned_ingredients_detached(self):
+        old = self.receipt.ingredients[0]
+        self.receipt.ingredients = [Ingredient("Сахар", 10, 10, 10)]
+        old.cost = 1000
+        self.assertEqual(self.receipt.calc_cost(), 10)
+        with self.assertRaises(ValueError):
+            self.receipt.remove(self.receipt.ingredients[0])
+
+    def test_dropped_receipts_released(self):
+        ingredient = Ingredient("Мёд", 50, 50, 80)
+        receipts = [Receipt._from_ingredients("x", [ingredient]) for _ in range(5)]
+        kept = receipts[2]
+        kept.add(ingredient)
+        del receipts
+        self.assertEqual(list(ingredient._owner.items()), [(kept, 2)])
+        ingredient.cost = 10
+        self.assertEqual(kept.calc_cost(), 20)
+        kept.remove(ingredient)
+        self.assertIs(ingredient._owner(), kept)
+        del kept
+        self.assertIsNone(ingredient._owner())
+        ingredient.cost = 5
+        self.assertIsNone(ingredient._owner)
+
+    def test_list_changes_update_totals(self):
+        receipt = Receipt.from_rows("x", [("a", 1, 1, 10)])
+        receipt.ingredients.append(Ingredient("b", 1, 1, 5))
+        self.assertEqual(receipt.calc_cost(), 15)
+        first = receipt.ingredients.pop(0)
+        self.assertEqual(receipt.calc_cost(), 5)
+        first.cost = 500
+        self.assertEqual(receipt.calc_cost(), 5)
+        receipt.ingredients += [first, Ingredient("c", 2, 2, 1)]
+        receipt.ingredients.insert(0, Ingredient("d", 3, 3, 2))
+        del receipt.ingredients[1]
+        self.assertEqual([i.name for i in receipt.ingredients], ["d", "a", "c"])
+        self.assertEqual(receipt.get("a"), first)
+        self.assertEqual(receipt.calc_weight(), 6)
+        self.assertNoDrift(receipt)
+
+    def test_item_assignment_detaches_old(self):
+        receipt = Receipt.from_rows("x", [("a", 1, 1, 1), ("b", 1, 1, 1)])
+        old = receipt.ingredients[0]
+        receipt.ingredients[0] = Ingredient("c", 1, 1, 100)
+        old.cost = 500
+        self.assertEqual(receipt.calc_cost(), 101)
+        receipt.ingredients[-1] = ("d", 2, 2, 3)
+        self.assertEqual(receipt.calc_cost(), 103)
+        self.assertEqual(receipt.get("d").raw_weight, 2)
+        self.assertIsNone(receipt.get("a"))
+        receipt.ingredients[:] = receipt.ingredients[::-1]  # перестановка
+        self.assertEqual([i.name for i in receipt.ingredients], ["d", "c"])
+        self.assertNoDrift(receipt)
+
+    def test_invalid_list_change_keeps_receipt(self):
+        ingredients = self.receipt.ingredients
+        with self.assertRaisesRegex(ValueError, "must be instances of Ingredient"):
+            ingredients.append("Сахар")
+        with self.assertRaisesRegex(ValueError, "must be instances of Ingredient"):
+            ingredients.insert(0, None)
+        with self.assertRaisesRegex(ValueError, "must be instances of Ingredient"):
+            ingredients[1] = 5
+        with self.assertRaisesRegex(ValueError, "Ingredient list cannot be empty."):
+            ingredients.clear()
+        self.assertEqual([i.name for i in ingredients], ["Йогурт", "Мёд"])
+        self.assertEqual(self.receipt.calc_cost(), 130)
+        self.receipt.ingredients = [Ingredient("Сахар", 10, 10, 10)]
+        ingredients.pop()  # прежний список рецепту больше не принадлежит
+        self.assertEqual(self.receipt.calc_cost(), 10)
+
+
+class TestReceiptIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.receipt = Receipt("Парфе", [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80), ("Йогурт", 100, 90, 25)])
+
+    def test_get(self):
+        yogurt, honey, second_yogurt = self.receipt.ingredients
+        self.assertIs(self.receipt.get("Мёд"), honey)
+        self.assertIs(self.receipt.get("Йогурт"), yogurt)
+        self.assertIsNone(self.receipt.get("Сахар"))
+        self.assertEqual(self.receipt.get("Сахар", 0), 0)
+        self.receipt.remove("Йогурт")
+        self.assertIs(self.receipt.get("Йогурт"), second_yogurt)
+        self.assertEqual(self.receipt.calc_cost(), 105)
+
+    def test_reordered_list(self):
+        receipt = Receipt("x", [("a", 1, 1, 30), ("b", 2, 2, 10), ("c", 3, 3, 20)])
+        a, b, c = receipt.ingredients
+        self.assertIs(receipt.get("a"), a)
+        receipt.ingredients.sort(key=lambda ingredient: ingredient.cost)
+        self.assertIs(receipt.get("a"), a)
+        receipt.remove("a")
+        self.assertEqual(receipt.ingredients, [b, c])
+        self.assertEqual(receipt.calc_cost(), 30)
+        receipt.ingredients.reverse()
+        receipt.remove(b)
+        self.assertEqual(receipt.ingredients, [c])
+        self.assertEqual(receipt.calc_weight(), 3)
+
+    def test_reordered_duplicates(self):
+        yogurt, honey, second_yogurt = self.receipt.ingredients
+        self.receipt.get("Йогурт")
+        self.receipt.ingredients.reverse()
+        self.assertIs(self.receipt.get("Йогурт"), second_yogurt)
+        self.assertIs(self.receipt.replace("Йогурт", ("Сахар", 10, 10, 5)), second_yogurt)
+        second_yogurt.name = "Сливки"
+        yogurt.name = "Сливки"
+        self.assertIs(self.receipt.get("Сливки"), yogurt)
+        self.assertIsNone(self.receipt.get("Йогурт"))
+        self.assertEqual(self.receipt.calc_cost(), 135)
+
+    def test_failed_remove_keeps_receipt(self):
+        self.receipt.get("Мёд")
+        self.receipt.ingredients.sort(key=lambda ingredient: ingredient.cost)
+        with self.assertRaisesRegex(ValueError, "Ingredient is not in the receipt."):
+            self.receipt.remove("Сахар")
+        self.assertEqual(self.receipt.calc_cost(), 155)
+        self.assertEqual([i.cost for i in self.receipt.ingredients], [25, 50, 80])
+
+    def test_remove_by_name_and_object(self):
+        ingredients = self.receipt.ingredients
+        honey = self.receipt.get("Мёд")
+        self.receipt.remove(honey)
+        with self.assertRaisesRegex(ValueError, "Ingredient is not in the receipt."):
+            self.receipt.remove(honey)
+        with self.assertRaisesRegex(ValueError, "Ingredient is not in the receipt."):
+            self.receipt.remove("Мёд")
+        self.receipt.remove("Йогурт")
+        with self.assertRaisesRegex(ValueError, "Ingredient list cannot be empty."):
+            self.receipt.remove("Йогурт")
+        self.assertIs(ingredients, self.receipt.ingredients)
+        self.assertEqual([i.cost for i in ingredients], [25])
+        self.assertEqual(self.receipt.calc_weight(), 100)
+
+    def test_replace(self):
+        honey = self.receipt.get("Мёд")
+        old = self.receipt.replace("Мёд", ("Сахар", 80, 80, 40))
+        self.assertIs(old, honey)
+        self.assertEqual([i.name for i in self.receipt.ingredients], ["Йогурт", "Сахар", "Йогурт"])
+        self.assertIsNone(self.receipt.get("Мёд"))
+        self.assertEqual(self.receipt.calc_cost(), 115)
+        honey.cost = 1
+        self.assertEqual(self.receipt.calc_cost(), 115)
+        with self.assertRaisesRegex(ValueError, "Cost must be non-negative."):
+            self.receipt.replace("Сахар", ("Соль", 1, 1, -1))
+        with self.assertRaisesRegex(ValueError, "must be instances of Ingredient."):
+            self.receipt.replace("Сахар", "Соль")
+        self.assertEqual(self.receipt.get("Сахар").cost, 40)
+
+    def test_rename_updates_index(self):
+        honey = self.receipt.get("Мёд")
+        other = Receipt("Чай", [("Вода", 100, 100, 0)])
+        other.add(honey)
+        other.add(honey)
+        other.get("Вода")
+        honey.name = "Сироп"
+        self.assertIs(self.receipt.get("Сироп"), honey)
+        self.assertIsNone(self.receipt.get("Мёд"))
+        other.remove("Сироп")
+        self.assertIs(other.get("Сироп"), honey)
+        self.assertEqual(other.calc_cost(), 80)
+
+    def test_random_edits(self):
+        rng = random.Random(25)
+        model = list(self.receipt.ingredients)
+        for step in range(3000):
+            action = rng.randrange(5)
+            name = f"Ингредиент {rng.randrange(40)}"
+            if action == 0 or len(model) == 1:
+                ingredient = Ingredient(name, rng.randint(1, 500), rng.randint(1, 500), rng.randint(0, 1000))
+                self.receipt.add(ingredient)
+                model.append(ingredient)
+            elif action == 1:
+                target = rng.choice(model)
+                if rng.random() < 0.5:
+                    self.receipt.remove(target.name)
+                    target = next(i for i in model if i.name == target.name)
+                else:
+                    self.receipt.remove(target)
+                model.remove(target)
+            elif action == 2:
+                target = rng.choice(model)
+                new = Ingredient(name, 1, 1, rng.randint(0, 1000))
+                self.assertIs(self.receipt.replace(target, new), target)
+                model[model.index(target)] = new
+            elif action == 3:
+                rng.choice(model).name = name
+            else:
+                expected = next((i for i in model if i.name == name), None)
+                self.assertIs(self.receipt.get(name), expected)
+        self.assertEqual(self.receipt.ingredients, model)
+        self.assertEqual(self.receipt.calc_cost(), sum(i.cost for i in model))
+
+
+class TestBulkConstruction(unittest.TestCase):
+
+    rows = [("Творог", 250, 230, 180), ("Сметана", 100, 95.5, 80), ("Ванилин", 1, 1, 0)]
+    bad_rows = [
+        (1, 10, 10, 10),
+        ("   ", 10, 10, 10),
+        ("Сахар", "10", 10, 10),
+        ("Сахар", 0, 10, 10),
+        ("Сахар", 10, -1, 10),
+        ("Сахар", 10, 10, None),
+        ("Сахар", 10, 10, -1),
+        ("Сахар", 10, 10, 1001),
+        ("Сахар", 10, 10),
+    ]
+
+    def assertSameIngredients(self, bulk, rows):
+        self.assertEqual(
+            [(i.name, i.raw_weight, i.cooked_weight, i.cost) for i in bulk],
+            [tuple(row) for row in rows],
+        )
+
+    def assertSameError(self, make, row):
+        with self.assertRaises(Exception) as expected:
+            Ingredient(*row)
+        with self.assertRaises(type(expected.exception)) as actual:
+            make()
+        self.assertEqual(str(actual.exception), str(expected.exception))
+
+    def test_bulk_matches_constructor(self):
+        self.assertSameIngredients(Ingredient.bulk(self.rows), self.rows)
+        self.assertSameIngredients(Ingredient.bulk(iter(self.rows)), self.rows)
+        self.assertEqual(Ingredient.bulk([]), [])
+
+    def test_bulk_same_errors(self):
+        for row in self.bad_rows:
+            with self.subTest(row=row):
+                self.assertSameError(lambda: Ingredient.bulk(self.rows + [row]), row)
+                self.assertSameError(lambda: Receipt.from_rows("Рецепт", [row] + self.rows), row)
+                self.assertSameError(lambda: ColumnarReceipt.from_rows("Рецепт", self.rows + [row]), row)
+
+    def test_first_bad_row_wins(self):
+        rows = [("Сахар", 10, 10, 5000), (1, 10, 10, 10)]
+        self.assertSameError(lambda: Ingredient.bulk(rows), rows[0])
+
+    def test_bool_and_nan_like_setters(self):
+        rows = [("Соль", True, 1, False), ("Перец", float("nan"), 1, 1)]
+        bulk = Ingredient.bulk(rows)
+        self.assertIs(bulk[0].raw_weight, True)
+        self.assertTrue(math.isnan(bulk[1].raw_weight))
+
+    def test_from_rows_matches_constructor(self):
+        for cls in (Receipt, ColumnarReceipt):
+            with self.subTest(cls=cls.__name__):
+                expected = cls("Рецепт", self.rows)
+                receipt = cls.from_rows("Рецепт", self.rows)
+                self.assertIs(type(receipt), cls)
+                self.assertEqual(receipt.name, expected.name)
+                self.assertSameIngredients(receipt.ingredients, self.rows)
+                self.assertEqual(receipt.calc_cost(3), expected.calc_cost(3))
+                self.assertEqual(receipt.calc_weight(raw=False), expected.calc_weight(raw=False))
+
+    def test_from_rows_invalid_name_and_empty(self):
+        with self.assertRaisesRegex(ValueError, "Recipe name cannot be empty."):
+            Receipt.from_rows("", self.rows)
+        for cls in (Receipt, ColumnarReceipt):
+            with self.assertRaisesRegex(ValueError, "Ingredient list cannot be empty."):
+                cls.from_rows("Рецепт", [])
+
+    def test_from_rows_tracks_totals(self):
+        receipt = Receipt.from_rows("Рецепт", self.rows)
+        receipt.ingredients[0].cost = 100
+        receipt.remove(receipt.ingredients[2])
+        receipt.add(("Сахар", 80, 80, 40))
+        self.assertEqual(receipt.calc_cost(), 220)
+        self.assertEqual(receipt.calc_weight(), 430)
+
+
+class TestPortionPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.receipts = [
+            Receipt("Парфе", [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80)]),
+            ColumnarReceipt("Ерундопель", [("Творог", 250, 230, 180), ("Ванилин", 1, 1, 5.5)]),
+        ]
+        self.portions = [1, 2, 0.5, 10]
+
+    def test_matches_calc_methods(self):
+        plan = plan_portions(iter(self.receipts), iter(self.portions))
+        for i, receipt in enumerate(self.receipts):
+            for j, portions in enumerate(self.portions):
+                self.assertEqual(plan.cost[i][j], receipt.calc_cost(portions))
+                self.assertEqual(plan.raw_weight[i][j], receipt.calc_weight(portions))
+                self.assertEqual(plan.cooked_weight[i][j], receipt.calc_weight(portions, raw=False))
+
+    def test_empty(self):
+        plan = plan_portions([], self.portions)
+        self.assertEqual(len(plan.cost), 0)
+
+    @unittest.skipIf(numpy is None, "NumPy не установлен")
+    def test_numpy_matrices(self):
+        plan = plan_portions(self.receipts, self.portions)
+        self.assertEqual(plan.cost.shape, (2, 4))
+        self.assertEqual(plan.cost.dtype, numpy.float64)
+        self.assertEqual(plan_portions([], self.portions).cost.shape, (0, 4))
+
+
+class TestStreamReceipts(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.errors = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as output:
+            output.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+        return path
+
+    def stream(self, path, **options):
+        return list(stream_receipts(path, on_error=self.errors.append, **options))
+
+    def test_jsonl(self):
+        record = {"title": "Парфе", "ingredients_list": [["Йогурт", 200, 180, 50], ["Мёд", 50, 50, 80]]}
+        lines = [
+            json.dumps(record, ensure_ascii=False),
+            "{broken",
+            "",
+            json.dumps({"title": "Дорого", "ingredients_list": [["Икра", 10, 10, 5000]]}),
+            json.dumps({"title": "Без списка"}),
+            json.dumps(record, ensure_ascii=False),
+        ]
+        path = self.write("dump.jsonl", "\n".join(lines).encode("utf-8") + b"\n\xff\n")
+        receipts = self.stream(path)
+        self.assertEqual([receipt.calc_cost() for receipt in receipts], [130, 130])
+        self.assertEqual([error.line for error in self.errors], [2, 4, 5, 7])
+        self.assertTrue(all(isinstance(error, LoadError) for error in self.errors))
+        self.assertEqual(self.errors[1].message, "Cost exceeds the maximum allowed value.")
+        self.assertEqual(str(self.errors[1]), "line 4: Cost exceeds the maximum allowed value.")
+
+    def test_csv(self):
+        path = self.write("dump.csv", (
+            "title,name,raw_weight,cooked_weight,cost\n"
+            "Парфе,Йогурт,200,180,50\n"
+            "Парфе,Мёд,50,50,80.5\n"
+            "Ошибка,Сахар,10,десять,10\n"
+            "Ошибка,Соль,1,1,1\n"
+            "\n"
+            "Короткая,Соль,1\n"
+            "Ерундопель,Творог,250,230,180\n"
+        ))
+        receipts = self.stream(path, receipt_class=ColumnarReceipt)
+        self.assertEqual([(receipt.name, receipt.calc_cost()) for receipt in receipts],
+                         [("Парфе", 130.5), ("Ерундопель", 180.0)])
+        self.assertIsInstance(receipts[0], ColumnarReceipt)
+        self.assertEqual([error.line for error in self.errors], [4, 7])
+        self.assertEqual(self.errors[0].message, "Could not parse number 'десять'.")
+
+    def test_csv_bom(self):
+        path = self.write("dump.csv", "\ufefftitle,name,raw_weight,cooked_weight,cost\nПарфе,Йогурт,200,180,50\n".encode("utf-8"))
+        receipts = self.stream(path)
+        self.assertEqual([(receipt.name, receipt.calc_cost()) for receipt in receipts], [("Парфе", 50)])
+        self.assertEqual(self.errors, [])
+
+    def test_csv_bad_bytes_and_rows(self):
+        path = self.write("dump.csv", (
+            "title,name,raw_weight,cooked_weight,cost\n"
+            "Парфе,Йогурт,200,180,50\n".encode("utf-8")
+            + b"\xd0\x9e\xff,\xd0\xa1,1,1,1\n"
+            + "Каша,Крупа,100,300,20\n".encode("utf-8")
+            + "Каша,Молоко,200,200,40\n".encode("utf-8")
+            + b"\xd0\x9a\xd0\xb0\xd1\x88\xd0\xb0,\"" + b"x" * 200 + b"\",1,1,1\n"
+            + "Ерундопель,Творог,250,230,180\n".encode("utf-8")
+        ))
+        limit = csv.field_size_limit(100)
+        try:
+            receipts = self.stream(path)
+        finally:
+            csv.field_size_limit(limit)
+        self.assertEqual([(receipt.name, receipt.calc_cost()) for receipt in receipts],
+                         [("Парфе", 50), ("Ерундопель", 180)])
+        self.assertEqual([error.line for error in self.errors], [3, 6])
+        self.assertEqual(self.errors[0].message, "Invalid UTF-8 byte sequence.")
+        self.assertIn("field larger than field limit", self.errors[1].message)
+
+    def test_as_tuples(self):
+        path = self.write("dump.csv", "title,name,raw_weight,cooked_weight,cost\nПарфе,Йогурт,200,180,-50\n")
+        self.assertEqual(self.stream(path, as_tuples=True), [("Парфе", [("Йогурт", 200, 180, -50)])])
+        self.assertEqual(self.errors, [])
+
+    def test_bad_header_and_format(self):
+        path = self.write("dump.txt", "name,title\nПарфе,Йогурт\n")
+        with self.assertRaises(ValueError):
+            stream_receipts(path).__next__()
+        self.assertEqual(self.stream(path, format="csv"), [])
+        self.assertEqual([error.line for error in self.errors], [1])
+
+    def test_errors_logged_by_default(self):
+        path = self.write("dump.jsonl", "[]\n")
+        with self.assertLogs("loader", level="WARNING") as logs:
+            self.assertEqual(list(stream_receipts(path)), [])
+        self.assertIn("line 1: Record must be a JSON object.", logs.output[0])
+
+
+class TestIngredientRegistry(unittest.TestCase):
+
+    rows = [("Мука", 100, 100, 90), ("Сахар", 80, 80, 40.5), ("Яйца", 2, 2, 50)]
+
+    def fresh(self, rows):
+        # новые объекты строк, как после разбора файла
+        return [(name.encode().decode(), *numbers) for name, *numbers in rows]
+
+    def test_frozen_ingredient(self):
+        ingredient = FrozenIngredient("Мука", 100, 100, 90)
+        self.assertIsInstance(ingredient, Ingredient)
+        for field in ("name", "raw_weight", "cooked_weight", "cost"):
+            with self.assertRaisesRegex(AttributeError, "FrozenIngredient is immutable."):
+                setattr(ingredient, field, 1)
+        with self.assertRaisesRegex(ValueError, "Cost exceeds the maximum allowed value."):
+            FrozenIngredient("Мука", 100, 100, 5000)
+
+    def test_intern_names(self):
+        registry = IngredientRegistry()
+        first = registry.receipt("Первый", self.fresh(self.rows))
+        second = registry.receipt("Второй", self.fresh(self.rows))
+        self.assertEqual(len(registry), 3)
+        for a, b in zip(first.ingredients, second.ingredients):
+            self.assertIs(a.name, b.name)
+            self.assertIsNot(a, b)
+        self.assertEqual(registry.saved_bytes, sum(sys.getsizeof(row[0]) for row in self.rows))
+        first.ingredients[0].cost = 10
+        self.assertEqual(second.calc_cost(), 180.5)
+
+    def test_share_frozen(self):
+        registry = IngredientRegistry(share=True)
+        first = registry.receipt("Первый", self.fresh(self.rows))
+        second = registry.receipt("Второй", self.fresh(self.rows) + [("Мука", 100.0, 100, 90)])
+        for a, b in zip(first.ingredients, second.ingredients):
+            self.assertIs(a, b)
+        self.assertIsNot(second.ingredients[3], second.ingredients[0])
+        self.assertIsInstance(second.ingredients[3].raw_weight, float)
+        self.assertGreater(registry.saved_bytes, 3 * sys.getsizeof(first.ingredients[0]))
+        second.remove(second.ingredients[0])
+        self.assertEqual(first.calc_cost(), 180.5)
+        self.assertEqual(second.calc_cost(), 180.5)
+        self.assertIsNone(first.ingredients[0]._owner)
+
+    def test_same_errors(self):
+        for share in (False, True):
+            registry = IngredientRegistry(share=share)
+            with self.assertRaisesRegex(ValueError, "Cost must be non-negative."):
+                registry.receipt("Рецепт", [("Мука", 100, 100, -1)])
+            with self.assertRaisesRegex(TypeError, "Name must be a string."):
+                registry.receipt("Рецепт", [(["Мука"], 100, 100, 1)])
+            with self.assertRaisesRegex(ValueError, "Ingredient list cannot be empty."):
+                registry.receipt("Рецепт", [])
+
+    def test_columnar_and_loader(self):
+        registry = IngredientRegistry(share=True)
+        receipt = registry.receipt("Рецепт", self.rows, receipt_class=ColumnarReceipt)
+        self.assertEqual(receipt.calc_cost(), 180.5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dump.jsonl")
+            with open(path, "w", encoding="utf-8") as output:
+                for title in ("Первый", "Второй"):
+                    output.write(json.dumps({"title": title, "ingredients_list": self.rows}) + "\n")
+            first, second = stream_receipts(path, registry=registry)
+        self.assertIs(first.ingredients[1], second.ingredients[1])
+
+
+class TestFrozenReceipt(unittest.TestCase):
+
+    rows = [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80)]
+
+    def test_value_equality_and_hash(self):
+        first, second = FrozenReceipt("Парфе", self.rows), FrozenReceipt.from_rows("Парфе", self.rows)
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second, FrozenReceipt("Другое", self.rows)}), 2)
+        self.assertNotEqual(first, FrozenReceipt("Парфе", self.rows[:1]))
+        self.assertNotEqual(first, Receipt("Парфе", self.rows))
+        self.assertEqual(FrozenIngredient(*self.rows[0]), FrozenIngredient(*self.rows[0]))
+        self.assertNotEqual(FrozenIngredient(*self.rows[0]), Ingredient(*self.rows[0]))
+        self.assertEqual({FrozenIngredient.bulk(self.rows)[1]: 1}[FrozenIngredient(*self.rows[1])], 1)
+
+    def test_hash_cached(self):
+        receipt = FrozenReceipt("Парфе", self.rows)
+        self.assertFalse(hasattr(receipt, "_hash"))
+        self.assertEqual(hash(receipt), receipt._hash)
+        self.assertEqual(receipt.ingredients[0]._hash, hash(receipt.ingredients[0]))
+
+    def test_immutable(self):
+        receipt = FrozenReceipt("Парфе", self.rows)
+        self.assertIsInstance(receipt, Receipt)
+        self.assertIsInstance(receipt.ingredients, tuple)
+        for action in (lambda: setattr(receipt, "name", "Другое"),
+                       lambda: setattr(receipt, "ingredients", []),
+                       lambda: receipt.add(("Сахар", 1, 1, 1)),
+                       lambda: receipt.remove(receipt.ingredients[0]),
+                       lambda: setattr(receipt.ingredients[0], "cost", 1)):
+            with self.assertRaisesRegex(AttributeError, "is immutable."):
+                action()
+        self.assertEqual(receipt.calc_cost(2), 260)
+        self.assertEqual(receipt.calc_weight(raw=False), 230)
+
+    def test_same_errors_and_sources(self):
+        with self.assertRaisesRegex(ValueError, "Recipe name cannot be empty."):
+            FrozenReceipt(" ", self.rows)
+        with self.assertRaisesRegex(ValueError, "Ingredient list cannot be empty."):
+            FrozenReceipt("Парфе", [])
+        with self.assertRaisesRegex(ValueError, "Cost exceeds the maximum allowed value."):
+            FrozenReceipt.from_rows("Парфе", [("Икра", 1, 1, 5000)])
+        mixed = FrozenReceipt("Парфе", [Ingredient(*self.rows[0]), FrozenIngredient(*self.rows[1])])
+        self.assertEqual(mixed, FrozenReceipt("Парфе", self.rows))
+        registry = IngredientRegistry(share=True)
+        shared = registry.receipt("Парфе", self.rows, receipt_class=FrozenReceipt)
+        self.assertIs(registry.receipt("Парфе", self.rows, receipt_class=FrozenReceipt).ingredients[0],
+                      shared.ingredients[0])
+
+    def test_lru_cache(self):
+        calls = []
+
+        @functools.lru_cache(maxsize=None)
+        def cost(receipt, portions):
+            calls.append(receipt)
+            return receipt.calc_cost(portions)
+
+        for _ in range(3):
+            self.assertEqual(cost(FrozenReceipt("Парфе", self.rows), 4), 520)
+        self.assertEqual(len(calls), 1)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.bin")
+        self.receipts = [
+            Receipt("Парфе", [("Йогурт", 200, 180, 50), ("Мёд", 50, 50, 80)]),
+            ColumnarReceipt("Ерундопель", [("Творог", 250.5, 230, 180), ("Ванилин", 1, 1, 5)]),
+            Receipt("Чай \U0001f375", [("Вода", 10 ** 20, 1, 0)]),
+        ]
+
+    def rows(self, receipt):
+        return [(i.name, i.raw_weight, i.cooked_weight, i.cost) for i in receipt.ingredients]
+
+    def test_round_trip(self):
+        self.assertEqual(save_receipts(self.path, iter(self.receipts)), 3)
+        with load_receipts(self.path) as snapshot:
+            self.assertIsInstance(snapshot, ReceiptSnapshot)
+            self.assertEqual(len(snapshot), 3)
+            for loaded, original in zip(snapshot, self.receipts):
+                self.assertIs(type(loaded), Receipt)
+                self.assertEqual(loaded.name, original.name)
+                self.assertEqual(self.rows(loaded), self.rows(original))
+                self.assertEqual(loaded.calc_cost(2), original.calc_cost(2))
+            self.assertEqual(snapshot[-1].name, "Чай \U0001f375")
+            self.assertEqual([receipt.name for receipt in snapshot[1:]], ["Ерундопель", "Чай \U0001f375"])
+            with self.assertRaises(IndexError):
+                snapshot[3]
+
+    def test_int_columns_stay_int(self):
+        save_receipts(self.path, self.receipts[:1])
+        with load_receipts(self.path) as snapshot:
+            self.assertIs(type(snapshot[0].calc_cost()), int)
+            self.assertIs(type(snapshot[0].calc_weight()), int)
+
+    def test_number_types_per_value(self):
+        receipts = [Receipt("A", [("x", 1.5, 2, 0.25)]),
+                    Receipt("B", [("x", 3, True, 0), ("y", 2 ** 60 + 1, 2 ** 70, 1000)]),
+                    Receipt("C", [("z", 0.1, -0.0 + 1e-300, 7)])]
+        save_receipts(self.path, receipts)
+        for receipt_class in (Receipt, ColumnarReceipt):
+            with load_receipts(self.path, receipt_class=receipt_class) as snapshot:
+                for loaded, original in zip(snapshot, receipts):
+                    rows = [tuple(map(type, row)) for row in self.rows(loaded)]
+                    self.assertEqual(self.rows(loaded), self.rows(original))
+                    self.assertEqual(rows, [(str, *(float if type(value) is float else int for value in row[1:]))
+                                            for row in self.rows(original)])
+
+    def test_lazy_and_cached(self):
+        save_receipts(self.path, self.receipts)
+        snapshot = load_receipts(self.path, receipt_class=ColumnarReceipt)
+        self.addCleanup(snapshot.close)
+        self.assertEqual(snapshot._cache, [None, None, None])
+        receipt = snapshot[1]
+        self.assertIsInstance(receipt, ColumnarReceipt)
+        self.assertEqual(snapshot._cache.count(None), 2)
+        receipt.ingredients[0].cost = 1
+        self.assertIs(snapshot[1], receipt)
+        self.assertEqual(snapshot[1].calc_cost(), 6.0)
+
+    def test_frozen_receipts(self):
+        save_receipts(self.path, self.receipts)
+        with load_receipts(self.path, receipt_class=FrozenReceipt) as snapshot:
+            self.assertEqual(snapshot[0], FrozenReceipt("Парфе", self.rows(self.receipts[0])))
+
+    def test_validate_and_close(self):
+        save_receipts(self.path, self.receipts)
+        snapshot = load_receipts(self.path, validate=True)
+        first = snapshot[0]
+        snapshot.close()
+        self.assertEqual(first.calc_weight(), 250)
+        self.assertEqual(snapshot[0].name, "Парфе")
+
+    def test_empty(self):
+        save_receipts(self.path, [])
+        with load_receipts(self.path) as snapshot:
+            self.assertEqual(list(snapshot), [])
+
+    def test_corrupted(self):
+        save_receipts(self.path, self.receipts)
+        with open(self.path, "rb") as source:
+            data = source.read()
+        cases = {
+            b"XXXX" + data[4:]: "File is not a receipt snapshot.",
+            data[:4] + b"\x03\x00" + data[6:]: "Unsupported snapshot version 3.",
+            data[:-1]: "Snapshot is truncated or corrupted.",
+            data[:10]: "Snapshot is truncated or corrupted.",
+        }
+        for broken, message in cases.items():
+            with open(self.path, "wb") as output:
+                output.write(broken)
+            with self.subTest(message=message), self.assertRaisesRegex(ValueError, message):
+                load_receipts(self.path)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file